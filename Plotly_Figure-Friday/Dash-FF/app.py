@@ -1,12 +1,21 @@
 # app.py
 import dash
-from dash import Input, Output, State, dcc, html
+from dash import Input, Output, Patch, State, dcc, html
 import dash_bootstrap_components as dbc
 import os
-import importlib.util
 from datetime import date
 from dash import callback_context as ctx
 import pandas as pd
+import plotly.io as pio
+from flask import Response, jsonify
+from flask_compress import Compress
+from utils.artifacts import load_artifact
+from utils.datasets import dataset_registry
+from utils.figure_cache import dataset_signature, figure_cache, find_dataset_files
+from utils.metrics import CONTENT_TYPE, lap, render_metrics, restart, stage, track
+from utils.model_cache import reduce_cache
+from utils.prefetch import prefetcher
+from utils.viz_loader import print_startup_report, read_module_data, startup_report
 
 FONT_LINK = "https://fonts.googleapis.com/css2?family=Roboto&display=swap"
 external_stylesheets = [
@@ -40,7 +49,8 @@ VIZ_DIR = "viz"
 
 def load_visualizations_data():
     """
-    Carga dinámicamente los datos de cada módulo de visualización.
+    Carga los metadatos de cada módulo de visualización sin importarlo:
+    el módulo real se importa cuando se pide uno de sus gráficos.
     Retorna un diccionario con los datos, ordenados por fecha descendente.
     """
     visualizations_data = {}
@@ -54,23 +64,20 @@ def load_visualizations_data():
             file_path = os.path.join(VIZ_DIR, filename)
 
             try:
-                spec = importlib.util.spec_from_file_location(module_name, file_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+                module, metadata = read_module_data(module_name, file_path)
 
                 visualizations_data[module_name] = {
-                    "project": getattr(module, "project", "Proyecto Desconocido"),
-                    "project_title": getattr(
-                        module,
+                    "project": metadata.get("project", "Proyecto Desconocido"),
+                    "project_title": metadata.get(
                         "project_title",
-                        getattr(module, "project", "Proyecto Desconocido"),
+                        metadata.get("project", "Proyecto Desconocido"),
                     ),
-                    "date": getattr(module, "date", date.min),
-                    "detail_project": getattr(
-                        module, "detail_project", "Sin detalles."
-                    ),
-                    "dataset_url": getattr(module, "dataset_url", "#"),
-                    "plots": getattr(module, "plots", []),
+                    "date": metadata.get("date", date.min),
+                    "detail_project": metadata.get("detail_project", "Sin detalles."),
+                    "dataset_url": metadata.get("dataset_url", "#"),
+                    "plots": metadata.get("plots", []),
+                    "datasets": find_dataset_files(file_path),
+                    "module": module,
                 }
             except Exception as e:
                 print(f"No se pudo cargar el módulo '{module_name}': {e}")
@@ -82,6 +89,9 @@ def load_visualizations_data():
 
 
 all_viz_data = load_visualizations_data()
+print_startup_report()
+# Recorta la caché de modelos ajustados al tamaño máximo configurado
+reduce_cache()
 available_viz_keys = list(all_viz_data.keys())
 initial_viz_key = available_viz_keys[0] if available_viz_keys else None
 initial_viz = all_viz_data.get(initial_viz_key, {})
@@ -95,6 +105,15 @@ app = dash.Dash(
     suppress_callback_exceptions=True,
 )
 
+# Compresión de las respuestas (callbacks, assets) según Accept-Encoding:
+# brotli si el navegador lo acepta, gzip en otro caso
+app.server.config.update(
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_BR_LEVEL=int(os.environ.get("COMPRESS_BR_LEVEL", 5)),
+    COMPRESS_LEVEL=int(os.environ.get("COMPRESS_LEVEL", 6)),
+)
+Compress(app.server)
+
 app.layout = dbc.Container(
     [
         dcc.Store(id="theme-store", data="dark"),
@@ -371,16 +390,55 @@ def toggle_download_modal(n_clicks_open, n_clicks_close, is_open, current_viz_da
     return is_open, dash.no_update
 
 
-# Callback para actualizar el dcc.Store
-@app.callback(
-    Output("current-viz-store", "data"),
-    Input({"type": "viz-item", "index": dash.ALL}, "n_clicks"),
-    Input("prev", "n_clicks"),
-    Input("next", "n_clicks"),
-    State("current-viz-store", "data"),
-    prevent_initial_call=True,
-)
-def update_current_viz(n_clicks_dropdown, prev_clicks, next_clicks, current_viz_data):
+def get_theme(switch_value):
+    if switch_value is None:
+        switch_value = 0
+    theme = "light" if switch_value % 2 == 0 else "dark"
+    template = "plotly_dark" if theme == "dark" else "none"
+    return theme, template
+
+
+def figure_key(viz_key, plot_index, template):
+    # La clave incluye la firma de los datasets: si cambian, se recalcula
+    datasets = all_viz_data.get(viz_key, {}).get("datasets", [])
+    return (viz_key, plot_index, template, dataset_signature(datasets))
+
+
+def build_figure(viz_key, plot_index, template):
+    viz_data = all_viz_data.get(viz_key, {})
+    current_plot = viz_data["plots"][plot_index]
+
+    def build():
+        # Artefacto precalculado (prebuild.py) si existe; si no, cálculo en vivo
+        restart()
+        with stage("artifact_load"):
+            fig = load_artifact(
+                viz_key,
+                plot_index,
+                template,
+                viz_data["module"].file_path,
+                viz_data.get("datasets", []),
+            )
+        if fig is None:
+            fig = current_plot["graph"](template)
+            # Lo que no fue carga de datos ni transformación es la figura
+            lap("figure")
+        return fig
+
+    return figure_cache.get_or_build(figure_key(viz_key, plot_index, template), build)
+
+
+# Plantillas serializadas para el cambio de tema sin recalcular la figura
+TEMPLATES_JSON = {
+    "plotly_dark": pio.templates["plotly_dark"].to_plotly_json(),
+    "none": pio.templates["none"].to_plotly_json(),
+}
+
+
+def navigate(current_viz_data):
+    """
+    Nuevo {key, index} según el botón o el elemento del menú pulsado.
+    """
     trigger = ctx.triggered[0]
     trigger_id = trigger["prop_id"]
 
@@ -404,7 +462,57 @@ def update_current_viz(n_clicks_dropdown, prev_clicks, next_clicks, current_viz_
     return {"key": current_key, "index": current_index}
 
 
-# Callback para actualizar la UI completa
+def prefetch_figure(viz_key, plot_index, template):
+    with track(viz_key, plot_index, "prefetch"):
+        build_figure(viz_key, plot_index, template)
+
+
+def prefetch_neighbours(viz_key, plot_index, template):
+    """
+    Programa en segundo plano el gráfico anterior y el siguiente del proyecto
+    y el primero del proyecto siguiente en el menú.
+    """
+    targets = [(viz_key, plot_index + 1), (viz_key, plot_index - 1)]
+    if viz_key in available_viz_keys:
+        position = available_viz_keys.index(viz_key)
+        if position + 1 < len(available_viz_keys):
+            targets.append((available_viz_keys[position + 1], 0))
+
+    tasks = []
+    for key, index in targets:
+        if not 0 <= index < len(all_viz_data.get(key, {}).get("plots", [])):
+            continue
+        if figure_key(key, index, template) in figure_cache:
+            continue
+        tasks.append(
+            (
+                (key, index, template),
+                lambda key=key, index=index: prefetch_figure(key, index, template),
+            )
+        )
+    prefetcher.schedule(tasks)
+
+
+# Callback para actualizar el dcc.Store
+@app.callback(
+    Output("current-viz-store", "data"),
+    Input({"type": "viz-item", "index": dash.ALL}, "n_clicks"),
+    Input("prev", "n_clicks"),
+    Input("next", "n_clicks"),
+    State("current-viz-store", "data"),
+    State("btn-theme-switch", "n_clicks"),
+    prevent_initial_call=True,
+)
+def update_current_viz(
+    n_clicks_dropdown, prev_clicks, next_clicks, current_viz_data, switch_value
+):
+    new_viz_data = navigate(current_viz_data)
+    _, template = get_theme(switch_value)
+    prefetch_neighbours(new_viz_data["key"], new_viz_data["index"], template)
+    return new_viz_data
+
+
+# Callback para actualizar la UI al navegar (el tema se lee como estado)
 @app.callback(
     [
         Output("id-plots", "children"),
@@ -414,25 +522,17 @@ def update_current_viz(n_clicks_dropdown, prev_clicks, next_clicks, current_viz_
         Output("next", "disabled"),
         Output("count-plot", "children"),
         Output("id-counter", "value"),
-        Output("page-container", "style"),
         Output("header-title", "children"),
-        Output("icon-prev", "className"),
-        Output("icon-next", "className"),
-        Output("icon-theme", "className"),
     ],
     [
         Input("current-viz-store", "data"),
-        Input("btn-theme-switch", "n_clicks"),
     ],
     [
-        State("page-container", "style"),
+        State("btn-theme-switch", "n_clicks"),
     ],
 )
-def update_ui(current_viz_data, switch_value, page_style):
-    if switch_value is None:
-        switch_value = 0
-    theme = "light" if switch_value % 2 == 0 else "dark"
-    template = "plotly_dark" if theme == "dark" else "none"
+def update_ui(current_viz_data, switch_value):
+    theme, template = get_theme(switch_value)
 
     viz_key = current_viz_data["key"]
     plot_index = current_viz_data["index"]
@@ -452,19 +552,17 @@ def update_ui(current_viz_data, switch_value, page_style):
             True,
             "0 of 0",
             0,
-            dash.no_update,
             "Sin proyecto",
-            "fa-solid fa-circle-arrow-left fa-xl",
-            "fa-solid fa-circle-arrow-right fa-3x",
-            "fa-solid fa-moon",
         )
 
     current_plot = plots[plot_index]
-    fig = current_plot["graph"](template)
+    with prefetcher.foreground(), track(viz_key, plot_index):
+        fig = build_figure(viz_key, plot_index, template)
 
     plot_div = html.Div(
         [
             dcc.Graph(
+                id="main-graph",
                 figure=fig,
                 config=config,
                 style={"min-height": "500px", "height": "100%", "width": "100%"},
@@ -481,15 +579,6 @@ def update_ui(current_viz_data, switch_value, page_style):
     progreso_porcentual = ((plot_index + 1) / len(plots)) * 100
     count_text = f"{plot_index + 1} de {len(plots)}"
 
-    page_bg = "#121212" if theme == "dark" else "#ffffff"
-    text_color = "white" if theme == "dark" else "#212529"
-    new_page_style = page_style.copy() if page_style else {}
-    new_page_style.update({"backgroundColor": page_bg, "color": text_color})
-
-    prev_class = f"fa-solid fa-circle-arrow-left fa-xl {'text-light' if theme == 'dark' else 'text-dark'}"
-    next_class = f"fa-solid fa-circle-arrow-right fa-3x {'text-light' if theme == 'dark' else 'text-dark'}"
-    icon_theme = "fa-solid fa-moon" if theme == "dark" else "fa-solid fa-sun"
-
     # Aquí es donde se usa el nuevo project_title
     project_title_display = viz_data.get(
         "project_title", viz_data.get("project", "Proyecto Desconocido")
@@ -503,14 +592,61 @@ def update_ui(current_viz_data, switch_value, page_style):
         active_next,
         count_text,
         progreso_porcentual,
-        new_page_style,
         project_title_display,
-        prev_class,
-        next_class,
-        icon_theme,
     )
 
 
+# Callback para el estilo de la página según el tema
+@app.callback(
+    Output("page-container", "style"),
+    Output("icon-prev", "className"),
+    Output("icon-next", "className"),
+    Output("icon-theme", "className"),
+    Input("btn-theme-switch", "n_clicks"),
+    State("page-container", "style"),
+)
+def update_theme(switch_value, page_style):
+    theme, _ = get_theme(switch_value)
+
+    page_bg = "#121212" if theme == "dark" else "#ffffff"
+    text_color = "white" if theme == "dark" else "#212529"
+    new_page_style = page_style.copy() if page_style else {}
+    new_page_style.update({"backgroundColor": page_bg, "color": text_color})
+
+    prev_class = f"fa-solid fa-circle-arrow-left fa-xl {'text-light' if theme == 'dark' else 'text-dark'}"
+    next_class = f"fa-solid fa-circle-arrow-right fa-3x {'text-light' if theme == 'dark' else 'text-dark'}"
+    icon_theme = "fa-solid fa-moon" if theme == "dark" else "fa-solid fa-sun"
+
+    return new_page_style, prev_class, next_class, icon_theme
+
+
+# Callback para cambiar el tema del gráfico: solo se envía layout.template,
+# las trazas y los frames de animación se quedan en el cliente
+@app.callback(
+    Output("main-graph", "figure"),
+    Input("btn-theme-switch", "n_clicks"),
+    State("current-viz-store", "data"),
+    prevent_initial_call=True,
+)
+def update_graph_theme(switch_value, current_viz_data):
+    _, template = get_theme(switch_value)
+
+    viz_key = current_viz_data["key"]
+    plot_index = current_viz_data["index"]
+    plots = all_viz_data.get(viz_key, {}).get("plots", [])
+    if not plots:
+        return dash.no_update
+
+    # Gráficos cuyas trazas dependen de la plantilla se recalculan completos
+    if not plots[plot_index].get("theme_patch", True):
+        with prefetcher.foreground(), track(viz_key, plot_index):
+            return build_figure(viz_key, plot_index, template)
+
+    patched_figure = Patch()
+    patched_figure["layout"]["template"] = TEMPLATES_JSON[template]
+    return patched_figure
+
+
 # Callback para el estilo del Dropdown
 @app.callback(
     Output("viz-selector-dropdown-menu", "label"),
@@ -553,5 +689,30 @@ app.clientside_callback(
 
 server = app.server
 
+
+# Estadísticas de la caché de figuras y del registro de datasets
+@server.route("/cache/stats")
+def cache_stats():
+    return jsonify(
+        {
+            "figures": figure_cache.stats(),
+            "datasets": dataset_registry.stats(),
+            "prefetch": prefetcher.stats(),
+        }
+    )
+
+
+# Tiempos de arranque por módulo viz (metadatos e importación diferida)
+@server.route("/startup/report")
+def startup_report_view():
+    return jsonify(startup_report)
+
+
+# Histogramas de latencia por etapa (formato de texto de Prometheus)
+@server.route("/metrics")
+def metrics_view():
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,252 @@
+# benchmark.py
+"""
+Mide cada gráfico de viz/ (módulo × gráfico × plantilla): tiempo de reloj,
+tiempo de CPU, pico de memoria (tracemalloc) y tamaño serializado.
+Guarda los resultados en un historial JSON (local, fuera de git) y termina
+con error si algún gráfico empeora más que el umbral respecto a la última
+ejecución.
+
+Por defecto se mide el camino habitual en caliente: datasets, agregados y
+modelos ya en caché. Con --cold se vacían todas las cachés antes de cada
+ejecución y se mide el cálculo completo; esos resultados se guardan con el
+sufijo "cold" y se comparan solo con otras ejecuciones en frío.
+
+Las cachés (backend, modelos, almacenes de tokens y cubo de viz1) van a un
+directorio temporal propio que se borra al terminar: el benchmark nunca lee
+ni vacía las de la app.
+
+    python benchmark.py [--modules viz2 viz7] [--repeat 3] [--threshold 0.25] [--cold]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(BASE_DIR)
+sys.path.insert(0, BASE_DIR)
+
+# Antes de importar utils/ y viz/, que leen estas rutas al cargarse
+BENCHMARK_CACHE_DIR = tempfile.mkdtemp(prefix="ff-benchmark-")
+os.environ["CACHE_SQLITE_PATH"] = os.path.join(BENCHMARK_CACHE_DIR, "cache.sqlite")
+os.environ["MODEL_CACHE_DIR"] = os.path.join(BENCHMARK_CACHE_DIR, "models")
+os.environ["BORDER_CUBE_DIR"] = BENCHMARK_CACHE_DIR
+atexit.register(shutil.rmtree, BENCHMARK_CACHE_DIR, ignore_errors=True)
+BORDER_CUBE_DIR = os.path.join(BENCHMARK_CACHE_DIR, "border_crossing_cube")
+
+import plotly.io as pio
+
+from utils.artifacts import TEMPLATES
+from utils.cache import cache_backend
+from utils.datasets import dataset_registry
+from utils.encoding import serialize_figure
+from utils.model_cache import memory
+from utils.text_embedding import TOKEN_STORE_DIR
+from utils.viz_loader import LazyModule
+
+VIZ_DIR = "viz"
+HISTORY_PATH = os.environ.get("BENCHMARK_HISTORY", "benchmarks/history.json")
+THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", 0.25))
+
+# Diferencias menores que estas se consideran ruido, no regresiones
+MIN_DELTA = {"wall_s": 0.05, "cpu_s": 0.05, "peak_mb": 5.0, "json_kb": 10.0}
+
+
+def discover_plots(modules=None):
+    """
+    (módulo, índice, función) de cada gráfico de viz/.
+    """
+    plots = []
+    for filename in sorted(os.listdir(VIZ_DIR)):
+        if not filename.endswith(".py") or filename == "__init__.py":
+            continue
+        module_name = filename[:-3]
+        if modules and module_name not in modules:
+            continue
+        try:
+            module = LazyModule(module_name, os.path.join(VIZ_DIR, filename)).load()
+        except Exception as e:
+            print(f"No se pudo cargar el módulo '{module_name}': {e}")
+            continue
+        for index, plot in enumerate(module.plots):
+            plots.append((module_name, index, plot["graph"]))
+    return plots
+
+
+def clear_caches():
+    """
+    Vacía el registro de datasets, el backend de caché (figuras y agregados
+    comparten backend), los modelos de joblib, los almacenes de tokens y el
+    cubo de viz1, también los de disco. Son todos los del benchmark.
+    """
+    dataset_registry.clear()
+    cache_backend.clear()
+    memory.clear(warn=False)
+    shutil.rmtree(TOKEN_STORE_DIR, ignore_errors=True)
+    shutil.rmtree(BORDER_CUBE_DIR, ignore_errors=True)
+
+
+def measure(graph, template, repeat, cold=False):
+    """
+    Mediana de tiempo de reloj y de CPU en repeat ejecuciones (tras una de
+    calentamiento), pico de memoria en una ejecución aparte con tracemalloc
+    (que ralentiza el código) y tamaño de la figura serializada. Con cold,
+    cada ejecución empieza con las cachés vacías.
+    """
+    fig = graph(template)
+    walls, cpus = [], []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        wall, cpu = time.perf_counter(), time.process_time()
+        fig = graph(template)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    try:
+        graph(template)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_s": statistics.median(walls),
+        "cpu_s": statistics.median(cpus),
+        "peak_mb": peak / 1024 / 1024,
+        "json_kb": len(pio.to_json(fig, validate=False)) / 1024,
+        "payload_kb": len(serialize_figure(fig)) / 1024,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def baseline_for(history, key):
+    """
+    Resultado de key en la ejecución más reciente que lo midió.
+    """
+    for run in reversed(history):
+        if key in run["results"]:
+            return run["results"][key]
+    return None
+
+
+def regressions(result, baseline, threshold):
+    found = []
+    for metric, min_delta in MIN_DELTA.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if old is None or new is None:
+            continue
+        if new - old > max(old * threshold, min_delta):
+            found.append(f"{metric} {old:.3f} -> {new:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="*", help="Solo estos módulos viz")
+    parser.add_argument("--templates", nargs="*", default=list(TEMPLATES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument(
+        "--no-save", action="store_true", help="No añadir la ejecución al historial"
+    )
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Vaciar las cachés (también las de disco) antes de cada ejecución",
+    )
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    results, failed, regressed = {}, [], []
+    print(
+        f"{'gráfico':<46}{'reloj s':>9}{'CPU s':>9}{'pico MB':>9}"
+        f"{'JSON KB':>9}{'envío KB':>10}"
+    )
+    for module_name, index, graph in discover_plots(args.modules):
+        for template in args.templates:
+            key = f"{module_name}[{index}] {graph.__name__} {template}"
+            if args.cold:
+                key += " cold"
+            try:
+                result = measure(graph, template, args.repeat, args.cold)
+            except Exception as e:
+                failed.append(key)
+                print(f"{key:<46} ERROR: {e}")
+                # Un gráfico que antes funcionaba y ahora falla es una regresión
+                if baseline_for(history, key):
+                    regressed.append((key, [f"error: {e}"]))
+                continue
+            results[key] = result
+            baseline = baseline_for(history, key)
+            found = regressions(result, baseline, args.threshold) if baseline else []
+            if found:
+                regressed.append((key, found))
+            print(
+                f"{key:<46}{result['wall_s']:9.3f}{result['cpu_s']:9.3f}"
+                f"{result['peak_mb']:9.1f}{result['json_kb']:9.1f}"
+                f"{result['payload_kb']:10.1f}" + ("  REGRESIÓN" if found else "")
+            )
+
+    if results and not args.no_save:
+        history.append(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "repeat": args.repeat,
+                "cold": args.cold,
+                "results": results,
+            }
+        )
+        save_history(args.history, history)
+
+    for key, found in regressed:
+        print(f"Regresión en {key}: {', '.join(found)}")
+    if failed:
+        print(f"{len(failed)} gráficos fallaron.")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# network_benchmark.py
+"""
+Escalado de la red de similitud de viz2.graphNetwork: desde las 85 golosinas
+del dataset hasta 50k elementos sintéticos (remuestreo con ruido en los
+porcentajes). Compara el bucle original con networkx, el motor vectorizado
+exacto (todas las aristas o solo los k vecinos más parecidos) y el modo
+aproximado.
+
+    python network_benchmark.py [--sizes 85 1000 10000 50000] [--neighbors 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(BASE_DIR)
+sys.path.insert(0, BASE_DIR)
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.network import (
+    adjacency_matrix,
+    approximate_similarity_edges,
+    circular_layout,
+    edge_coordinates,
+    pagerank,
+    similarity_edges,
+)
+
+FEATURES = [
+    "chocolate",
+    "fruity",
+    "caramel",
+    "peanutyalmondy",
+    "nougat",
+    "crispedricewafer",
+    "hard",
+    "bar",
+    "pluribus",
+    "sugarpercent",
+    "pricepercent",
+]
+THRESHOLD = 0.85
+
+
+def make_items(n, seed=0):
+    """
+    n elementos con las columnas de candy-data.csv: el dataset tal cual si
+    n es su tamaño; si no, filas remuestreadas con ruido en sugar/price.
+    """
+    X = pd.read_csv("dataset/candy-data.csv")[FEATURES].to_numpy(dtype=float)
+    if n == len(X):
+        return X
+    rng = np.random.default_rng(seed)
+    items = X[rng.integers(0, len(X), n)]
+    items[:, -2:] = np.clip(items[:, -2:] + rng.normal(0, 0.05, (n, 2)), 0, 1)
+    return items
+
+
+def networkx_network(X):
+    """
+    Implementación original: cosine_similarity completa y bucle por pares.
+    """
+    sim_matrix = cosine_similarity(X)
+    G = nx.Graph()
+    G.add_nodes_from(range(len(X)))
+    for i in range(len(X)):
+        for j in range(i + 1, len(X)):
+            if sim_matrix[i, j] > THRESHOLD:
+                G.add_edge(i, j, weight=sim_matrix[i, j])
+    ranks = nx.pagerank(G)
+    return G.number_of_edges(), np.array([ranks[i] for i in range(len(X))])
+
+
+def engine_network(find_edges, X, **kwargs):
+    rows, cols, weights = find_edges(X, THRESHOLD, **kwargs)
+    ranks = pagerank(adjacency_matrix(rows, cols, weights, len(X)))
+    node_x, node_y = circular_layout(len(X))
+    edge_coordinates(rows, cols, node_x, node_y)
+    return len(rows), ranks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", nargs="*", type=int, default=[85, 1000, 5000, 20000, 50000]
+    )
+    parser.add_argument("--neighbors", type=int, default=20)
+    parser.add_argument(
+        "--networkx-max", type=int, default=2000, help="Tamaño máximo con networkx"
+    )
+    parser.add_argument(
+        "--exact-max",
+        type=int,
+        default=10000,
+        help="Tamaño máximo con todas las aristas (sin límite de vecinos)",
+    )
+    args = parser.parse_args()
+
+    k = args.neighbors
+    print(f"{'n':>7} {'método':<14}{'tiempo s':>10}{'aristas':>11}{'ρ PageRank':>12}")
+    for n in args.sizes:
+        X = make_items(n)
+        # (nombre, ejecución, variante de referencia para comparar PageRank)
+        methods = []
+        if n <= args.networkx_max:
+            methods.append(("networkx", lambda: networkx_network(X), None))
+        if n <= args.exact_max:
+            methods.append(
+                (
+                    "exacto",
+                    lambda: engine_network(similarity_edges, X),
+                    "networkx",
+                )
+            )
+        methods.append(
+            (
+                f"exacto k={k}",
+                lambda: engine_network(similarity_edges, X, max_neighbors=k),
+                "exacto",
+            )
+        )
+        methods.append(
+            (
+                f"aprox. k={k}",
+                lambda: engine_network(
+                    approximate_similarity_edges, X, max_neighbors=k
+                ),
+                f"exacto k={k}",
+            )
+        )
+
+        ranks_by_method = {}
+        for name, run, reference in methods:
+            start = time.perf_counter()
+            edges, ranks = run()
+            seconds = time.perf_counter() - start
+            ranks_by_method[name] = ranks
+            # Correlación de rangos con la variante de referencia
+            if reference in ranks_by_method:
+                rho = f"{spearmanr(ranks_by_method[reference], ranks).statistic:12.3f}"
+            else:
+                rho = f"{'-':>12}"
+            print(f"{n:>7} {name:<14}{seconds:10.3f}{edges:11d}{rho}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# payload_report.py
+"""
+Tamaño de cada figura enviada al navegador: JSON plano frente a JSON con
+arrays binarios (bdata), sin comprimir y con gzip/brotli.
+
+    python payload_report.py [--modules viz1 viz5] [--template plotly_dark]
+"""
+
+import argparse
+import gzip
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(BASE_DIR)
+sys.path.insert(0, BASE_DIR)
+
+import brotli
+import plotly.io as pio
+
+from utils.encoding import serialize_figure
+from utils.viz_loader import LazyModule
+
+VIZ_DIR = "viz"
+
+COLUMNS = ("json", "json+gzip", "bdata", "bdata+gzip", "bdata+br")
+
+
+def payload_sizes(fig):
+    """
+    Bytes de la figura en cada variante de COLUMNS.
+    """
+    plain = pio.to_json(fig, validate=False).encode("utf-8")
+    encoded = serialize_figure(fig).encode("utf-8")
+    return dict(
+        zip(
+            COLUMNS,
+            (
+                len(plain),
+                len(gzip.compress(plain, compresslevel=6)),
+                len(encoded),
+                len(gzip.compress(encoded, compresslevel=6)),
+                len(brotli.compress(encoded, quality=5)),
+            ),
+        )
+    )
+
+
+def kb(size):
+    return f"{size / 1024:10.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="*", help="Solo estos módulos viz")
+    parser.add_argument("--template", default="plotly_dark")
+    args = parser.parse_args()
+
+    print(f"{'gráfico':<32}" + "".join(f"{name:>11}" for name in COLUMNS) + "  (KB)")
+    totals = dict.fromkeys(COLUMNS, 0)
+    for filename in sorted(os.listdir(VIZ_DIR)):
+        if not filename.endswith(".py") or filename == "__init__.py":
+            continue
+        module_name = filename[:-3]
+        if args.modules and module_name not in args.modules:
+            continue
+        file_path = os.path.join(VIZ_DIR, filename)
+        try:
+            module = LazyModule(module_name, file_path).load()
+        except Exception as e:
+            print(f"No se pudo cargar el módulo '{module_name}': {e}")
+            continue
+        for index, plot in enumerate(module.plots):
+            label = f"{module_name}[{index}] {plot['graph'].__name__}"[:31]
+            try:
+                sizes = payload_sizes(plot["graph"](args.template))
+            except Exception as e:
+                print(f"{label:<32} ERROR: {e}")
+                continue
+            for name in COLUMNS:
+                totals[name] += sizes[name]
+            saving = 1 - sizes["bdata+br"] / sizes["json"]
+            print(
+                f"{label:<32}"
+                + "".join(f"{kb(sizes[name]):>11}" for name in COLUMNS)
+                + f"  -{saving:.0%}"
+            )
+    if totals["json"]:
+        saving = 1 - totals["bdata+br"] / totals["json"]
+        print(
+            f"{'TOTAL':<32}"
+            + "".join(f"{kb(totals[name]):>11}" for name in COLUMNS)
+            + f"  -{saving:.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
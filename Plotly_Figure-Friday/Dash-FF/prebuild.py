@@ -0,0 +1,109 @@
+# prebuild.py
+"""
+Precalcula todas las figuras (módulo viz × gráfico × plantilla) y las guarda
+como artefactos JSON. En ejecución, update_ui sirve el artefacto si existe.
+
+    python prebuild.py [--jobs N] [--output artifacts] [--modules viz1 viz2]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(BASE_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from utils.artifacts import (
+    ARTIFACTS_DIR,
+    TEMPLATES,
+    artifact_hash,
+    artifact_path,
+    write_artifact,
+)
+from utils.encoding import serialize_figure
+from utils.figure_cache import find_dataset_files
+from utils.viz_loader import LazyModule, read_module_data
+
+VIZ_DIR = "viz"
+
+# Módulos ya importados en cada proceso del pool
+_modules = {}
+
+
+def discover_tasks(output, modules=None):
+    """
+    Una tarea por (módulo, índice de gráfico, plantilla).
+    """
+    tasks = []
+    for filename in sorted(os.listdir(VIZ_DIR)):
+        if not filename.endswith(".py") or filename == "__init__.py":
+            continue
+        module_name = filename[:-3]
+        if modules and module_name not in modules:
+            continue
+        file_path = os.path.join(VIZ_DIR, filename)
+        datasets = find_dataset_files(file_path)
+        try:
+            _, metadata = read_module_data(module_name, file_path)
+        except Exception as e:
+            print(f"No se pudo cargar el módulo '{module_name}': {e}")
+            continue
+        plots = metadata.get("plots", [])
+        for index in range(len(plots)):
+            for template in TEMPLATES:
+                digest = artifact_hash(file_path, datasets, template)
+                path = artifact_path(module_name, index, template, digest, output)
+                tasks.append((module_name, file_path, index, template, path))
+    return tasks
+
+
+def render(task):
+    module_name, file_path, index, template, path = task
+    start = time.perf_counter()
+    module = _modules.get(module_name)
+    if module is None:
+        module = _modules[module_name] = LazyModule(module_name, file_path).load()
+    fig = module.plots[index]["graph"](template)
+    payload = serialize_figure(fig)
+    write_artifact(path, payload)
+    return time.perf_counter() - start, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="Directorio de artefactos")
+    parser.add_argument("--modules", nargs="*", help="Solo estos módulos viz")
+    parser.add_argument(
+        "--force", action="store_true", help="Recalcular aunque el artefacto exista"
+    )
+    args = parser.parse_args()
+
+    output = args.output or ARTIFACTS_DIR
+    os.makedirs(output, exist_ok=True)
+    tasks = discover_tasks(output, args.modules)
+    pending = [task for task in tasks if args.force or not os.path.exists(task[-1])]
+    print(f"{len(tasks)} figuras, {len(tasks) - len(pending)} ya vigentes.")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(render, task): task for task in pending}
+        for future in as_completed(futures):
+            module_name, _, index, template, path = futures[future]
+            try:
+                seconds, size = future.result()
+                print(
+                    f"  {module_name}[{index}] {template:<11} {seconds:6.2f} s"
+                    f" {size / 1024:8.1f} KB -> {os.path.basename(path)}"
+                )
+            except Exception as e:
+                failed += 1
+                print(f"  {module_name}[{index}] {template:<11} ERROR: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
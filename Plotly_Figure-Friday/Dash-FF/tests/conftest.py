@@ -0,0 +1,18 @@
+# conftest.py
+import os
+import shutil
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Las cachés en disco de utils/ van a un directorio temporal, no al árbol
+_cache_dir = tempfile.mkdtemp(prefix="dash-ff-tests-")
+os.environ.setdefault("MODEL_CACHE_DIR", os.path.join(_cache_dir, "models"))
+os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(_cache_dir, "cache.sqlite"))
+os.environ.setdefault("FIGURE_ARTIFACTS_DIR", os.path.join(_cache_dir, "artifacts"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_cache_dir, ignore_errors=True)
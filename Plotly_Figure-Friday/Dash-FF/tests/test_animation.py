@@ -0,0 +1,37 @@
+# test_animation.py
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.animation import animation_controls
+
+
+def test_controls_match_plotly_express():
+    df = pd.DataFrame({"a": [1, 2, 3, 4], "b": [1, 2, 3, 4], "c": [1, 1, 2, 2]})
+    df["Date"] = list("xxyy")
+    # px usa redraw=True en los ternarios y redraw=False en scatter
+    fig = px.scatter_ternary(df, a="a", b="b", c="c", animation_frame="Date")
+    updatemenus, sliders = animation_controls(["x", "y"], "Date")
+    assert built_matches(fig, updatemenus, sliders)
+
+    fig = px.scatter(df, x="a", y="b", animation_frame="Date")
+    updatemenus, sliders = animation_controls(["x", "y"], "Date", redraw=False)
+    assert built_matches(fig, updatemenus, sliders)
+
+
+def built_matches(fig, updatemenus, sliders):
+    built = go.Figure(layout=dict(updatemenus=updatemenus, sliders=sliders))
+    return (
+        built.layout.updatemenus == fig.layout.updatemenus
+        and built.layout.sliders == fig.layout.sliders
+    )
+
+
+def test_redraw_flag_reaches_every_animate_call():
+    updatemenus, sliders = animation_controls(["a", "b", "c"], "Year", redraw=False)
+    calls = [button["args"][1] for button in updatemenus[0]["buttons"]]
+    calls += [step["args"][1] for step in sliders[0]["steps"]]
+    assert len(calls) == 5
+    assert all(call["frame"]["redraw"] is False for call in calls)
+    assert [step["label"] for step in sliders[0]["steps"]] == ["a", "b", "c"]
+    assert sliders[0]["currentvalue"]["prefix"] == "Year="
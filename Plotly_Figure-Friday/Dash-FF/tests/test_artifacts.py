@@ -0,0 +1,78 @@
+# test_artifacts.py
+import os
+
+import pytest
+
+from utils import artifacts
+from utils.artifacts import artifact_hash, artifact_path, load_artifact, write_artifact
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    utils_dir = tmp_path / "utils"
+    utils_dir.mkdir()
+    (utils_dir / "helper.py").write_text("VALUE = 1\n")
+    monkeypatch.setattr(artifacts, "UTILS_DIR", str(utils_dir))
+    module = tmp_path / "viz9.py"
+    module.write_text("def graph(template):\n    pass\n")
+    dataset = tmp_path / "data.csv"
+    dataset.write_text("a\n1\n")
+    return str(module), str(dataset), utils_dir / "helper.py"
+
+
+def rewrite(path, text):
+    path.write_text(text)
+    # Otro tamaño o mtime invalida el digest memorizado
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_hash_is_stable(sources):
+    module, dataset, _ = sources
+    assert artifact_hash(module, [dataset], "none") == artifact_hash(
+        module, [dataset], "none"
+    )
+    assert artifact_hash(module, [dataset], "none") != artifact_hash(
+        module, [dataset], "plotly_dark"
+    )
+
+
+def test_hash_changes_with_module_dataset_and_utils(sources, tmp_path):
+    module, dataset, helper = sources
+    seen = {artifact_hash(module, [dataset], "none")}
+    rewrite(tmp_path / "viz9.py", "def graph(template):\n    return 1\n")
+    seen.add(artifact_hash(module, [dataset], "none"))
+    rewrite(tmp_path / "data.csv", "a\n2\n")
+    seen.add(artifact_hash(module, [dataset], "none"))
+    rewrite(helper, "VALUE = 2\n")
+    seen.add(artifact_hash(module, [dataset], "none"))
+    assert len(seen) == 4
+
+
+def test_hash_changes_with_encoding_version(sources, monkeypatch):
+    module, dataset, _ = sources
+    before = artifact_hash(module, [dataset], "none")
+    monkeypatch.setattr(artifacts, "ENCODING_VERSION", artifacts.ENCODING_VERSION + 1)
+    assert artifact_hash(module, [dataset], "none") != before
+
+
+def test_missing_dataset_still_hashes(sources, tmp_path):
+    module, _, _ = sources
+    assert artifact_hash(module, [str(tmp_path / "missing.csv")], "none")
+
+
+def test_write_and_load_artifact(sources, tmp_path, monkeypatch):
+    module, dataset, _ = sources
+    monkeypatch.setattr(artifacts, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    assert load_artifact("viz9", 0, "none", module, [dataset]) is None
+
+    os.makedirs(artifacts.ARTIFACTS_DIR)
+    old_path = artifact_path("viz9", 0, "none", "0" * 16)
+    write_artifact(old_path, '{"data": [], "old": true}')
+    digest = artifact_hash(module, [dataset], "none")
+    write_artifact(artifact_path("viz9", 0, "none", digest), '{"data": []}')
+
+    assert load_artifact("viz9", 0, "none", module, [dataset]) == {"data": []}
+    # La versión anterior se elimina al escribir la nueva
+    assert not os.path.exists(old_path)
+    assert load_artifact("viz9", 1, "none", module, [dataset]) is None
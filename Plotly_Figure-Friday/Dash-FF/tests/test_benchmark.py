@@ -0,0 +1,46 @@
+# test_benchmark.py
+import os
+
+import benchmark
+from benchmark import baseline_for, regressions
+
+
+def test_baseline_is_the_latest_run_with_the_key():
+    history = [
+        {"results": {"viz1[0] graph none": {"wall_s": 1.0}}},
+        {"results": {"viz2[0] graph none": {"wall_s": 2.0}}},
+    ]
+    assert baseline_for(history, "viz1[0] graph none") == {"wall_s": 1.0}
+    assert baseline_for(history, "viz3[0] graph none") is None
+
+
+def test_regressions_ignore_noise_below_threshold_or_min_delta():
+    baseline = {"wall_s": 1.0, "cpu_s": 0.01, "peak_mb": 100.0, "json_kb": 50.0}
+    result = {"wall_s": 1.2, "cpu_s": 0.05, "peak_mb": 104.0, "json_kb": 50.0}
+    assert regressions(result, baseline, 0.25) == []
+
+
+def test_regressions_report_each_metric():
+    baseline = {"wall_s": 1.0, "cpu_s": 1.0, "peak_mb": 10.0, "json_kb": 50.0}
+    result = {"wall_s": 1.5, "cpu_s": 1.1, "peak_mb": 20.0, "json_kb": 50.0}
+    found = regressions(result, baseline, 0.25)
+    assert found == ["wall_s 1.000 -> 1.500", "peak_mb 10.000 -> 20.000"]
+
+
+def test_cold_measure_clears_caches_before_each_run(monkeypatch):
+    cleared = []
+    monkeypatch.setattr(benchmark, "clear_caches", lambda: cleared.append(1))
+    benchmark.measure(lambda template: {"data": []}, "none", 3, cold=True)
+    # Tres repeticiones y la ejecución con tracemalloc
+    assert len(cleared) == 4
+    cleared.clear()
+    benchmark.measure(lambda template: {"data": []}, "none", 3)
+    assert cleared == []
+
+
+def test_clear_caches_removes_the_benchmark_border_cube():
+    assert benchmark.BORDER_CUBE_DIR.startswith(benchmark.BENCHMARK_CACHE_DIR)
+    cube = os.path.join(benchmark.BORDER_CUBE_DIR, "1_2.parquet")
+    os.makedirs(cube)
+    benchmark.clear_caches()
+    assert not os.path.exists(benchmark.BORDER_CUBE_DIR)
@@ -0,0 +1,70 @@
+# test_border_cube.py
+import os
+
+import pandas as pd
+
+from viz.viz1 import build_cube, cube_path, remove_stale_cubes
+
+
+def write_source(path):
+    df = pd.DataFrame(
+        {
+            "Date": ["Jan 2024", "Jan 2024", "Feb 2024", "Mar 2025", "Mar 2025"],
+            "Border": ["US-Canada Border", "US-Canada Border"]
+            + ["US-Mexico Border"] * 3,
+            "Measure": ["Trucks", "Trucks", "Buses", "Trucks", "Buses"],
+            "Value": [1, 2, 3, 4, 5],
+            "Port Name": ["a", "b", "c", "d", "e"],
+        }
+    )
+    df.to_parquet(path, index=False)
+    return str(path)
+
+
+def test_build_cube_sums_by_month_border_and_measure(tmp_path):
+    source = write_source(tmp_path / "border.parquet")
+    cube_dir = cube_path(source, str(tmp_path / "cubes"))
+    os.makedirs(os.path.dirname(cube_dir))
+    build_cube(source, cube_dir)
+
+    cube = pd.read_parquet(cube_dir)
+    cube["Year"] = cube["Year"].astype(int)
+    cube = cube.astype({"Border": str, "Measure": str})
+    rows = sorted(
+        cube[["Year", "Month", "Border", "Measure", "Value"]].itertuples(index=False)
+    )
+    assert [tuple(row) for row in rows] == [
+        (2024, 1, "US-Canada Border", "Trucks", 3),
+        (2024, 2, "US-Mexico Border", "Buses", 3),
+        (2025, 3, "US-Mexico Border", "Buses", 5),
+        (2025, 3, "US-Mexico Border", "Trucks", 4),
+    ]
+    assert not [name for name in os.listdir(tmp_path / "cubes") if ".tmp" in name]
+
+
+def test_second_build_of_the_same_version_keeps_the_first(tmp_path):
+    source = write_source(tmp_path / "border.parquet")
+    cube_dir = cube_path(source, str(tmp_path / "cubes"))
+    os.makedirs(os.path.dirname(cube_dir))
+    build_cube(source, cube_dir)
+    # Otro worker publica la misma versión: no falla y no deja temporales
+    build_cube(source, cube_dir)
+    assert os.listdir(tmp_path / "cubes") == [os.path.basename(cube_dir)]
+
+
+def test_cube_path_follows_the_source_version(tmp_path):
+    source = write_source(tmp_path / "border.parquet")
+    root = str(tmp_path / "cubes")
+    first = cube_path(source, root)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cube_path(source, root) != first
+    assert os.path.dirname(first) == root
+
+
+def test_remove_stale_cubes_keeps_the_current_one(tmp_path):
+    root = tmp_path / "cubes"
+    for name in ("1_10.parquet", "2_10.parquet"):
+        (root / name).mkdir(parents=True)
+    remove_stale_cubes(str(root / "2_10.parquet"), str(root))
+    assert os.listdir(root) == ["2_10.parquet"]
@@ -0,0 +1,84 @@
+# test_cache.py
+import numpy as np
+import pytest
+
+from utils import cache
+from utils.cache import MemoryBackend, SQLiteBackend, cache_key, cached_aggregate
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_bytes):
+        if request.param == "memory":
+            return MemoryBackend(max_bytes)
+        return SQLiteBackend(str(tmp_path / "cache.sqlite"), max_bytes)
+
+    return make
+
+
+def test_cache_key_is_stable_text():
+    assert cache_key("figure", ("viz1", 0)) == cache_key("figure", ["viz1", 0])
+    assert cache_key("a", 1) != cache_key("a", "1")
+
+
+def test_set_get_and_contains(make_backend):
+    backend = make_backend(1000)
+    assert backend.get("k") is None
+    backend.set("k", b"value")
+    assert backend.get("k") == b"value"
+    assert backend.contains("k")
+    backend.clear()
+    assert not backend.contains("k")
+
+
+def test_evicts_least_recently_used_by_size(make_backend):
+    backend = make_backend(30)
+    backend.set("a", b"x" * 10)
+    backend.set("b", b"x" * 10)
+    backend.set("c", b"x" * 10)
+    # "a" pasa a ser la más reciente; al superar 30 bytes sale "b"
+    assert backend.get("a") is not None
+    backend.set("d", b"x" * 10)
+    assert [backend.contains(k) for k in "abcd"] == [True, False, True, True]
+    assert backend.stats()["size_bytes"] == 30
+    assert backend.evictions == 1
+
+
+def test_replacing_a_key_updates_the_size(make_backend):
+    backend = make_backend(100)
+    backend.set("a", b"x" * 40)
+    backend.set("a", b"x" * 10)
+    assert backend.stats()["size_bytes"] == 10
+    assert backend.stats()["entries"] == 1
+
+
+def test_oversized_values_are_not_stored(make_backend):
+    backend = make_backend(10)
+    backend.set("small", b"x" * 5)
+    backend.set("big", b"x" * 11)
+    assert not backend.contains("big")
+    assert backend.contains("small")
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteBackend(path, 1000).set("k", "texto")
+    assert SQLiteBackend(path, 1000).get("k") == "texto".encode("utf-8")
+    with SQLiteBackend(path, 1000).lock("k"):
+        pass
+
+
+def test_cached_aggregate_computes_once(monkeypatch):
+    monkeypatch.setattr(cache, "cache_backend", MemoryBackend(1 << 20))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(5)
+
+    first = cached_aggregate("test", ("v1",), compute)
+    second = cached_aggregate("test", ("v1",), compute)
+    np.testing.assert_array_equal(first, second)
+    assert len(calls) == 1
+    cached_aggregate("test", ("v2",), compute)
+    assert len(calls) == 2
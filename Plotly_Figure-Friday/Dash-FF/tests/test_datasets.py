@@ -0,0 +1,70 @@
+# test_datasets.py
+import os
+
+import pandas as pd
+
+from utils.datasets import DatasetRegistry
+
+
+def write_csv(path, rows):
+    pd.DataFrame({"a": range(rows), "b": [f"x{i}" for i in range(rows)]}).to_csv(
+        path, index=False
+    )
+    return str(path)
+
+
+def test_parses_once_and_returns_independent_copies(tmp_path):
+    path = write_csv(tmp_path / "data.csv", 5)
+    registry = DatasetRegistry(1 << 30, 3600)
+    first = registry.get(path)
+    first.loc[0, "a"] = 99
+    second = registry.get(path)
+    assert second.loc[0, "a"] == 0
+    assert (registry.loads, registry.hits) == (1, 1)
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    path = write_csv(tmp_path / "data.csv", 5)
+    registry = DatasetRegistry(1 << 30, 3600)
+    assert len(registry.get(path)) == 5
+    write_csv(tmp_path / "data.csv", 8)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert len(registry.get(path)) == 8
+    assert registry.loads == 2
+
+
+def test_registered_name_uses_its_read_options(tmp_path):
+    path = write_csv(tmp_path / "data.csv", 5)
+    registry = DatasetRegistry(1 << 30, 3600)
+    registry.register("data", path, usecols=["a"])
+    assert list(registry.get("data").columns) == ["a"]
+
+
+def test_evicts_over_budget_and_drops_locks(tmp_path):
+    paths = [write_csv(tmp_path / f"data{i}.csv", 1000) for i in range(3)]
+    # Cabe un solo dataset: cada carga expulsa el anterior
+    registry = DatasetRegistry(1, 3600)
+    for path in paths:
+        registry.get(path)
+    stats = registry.stats()
+    assert list(stats["datasets"]) == [paths[-1]]
+    assert registry.evictions == 2
+    assert len(registry._key_locks) == 1
+
+
+def test_evicts_idle_entries(tmp_path):
+    first = write_csv(tmp_path / "a.csv", 5)
+    second = write_csv(tmp_path / "b.csv", 5)
+    registry = DatasetRegistry(1 << 30, 0)
+    registry.get(first)
+    registry.get(second)
+    assert list(registry.stats()["datasets"]) == [second]
+
+
+def test_clear_empties_entries_and_locks(tmp_path):
+    registry = DatasetRegistry(1 << 30, 3600)
+    registry.get(write_csv(tmp_path / "data.csv", 5))
+    registry.clear()
+    assert registry.stats()["datasets"] == {}
+    assert registry._key_locks == {}
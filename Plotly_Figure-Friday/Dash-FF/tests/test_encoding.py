@@ -0,0 +1,142 @@
+# test_encoding.py
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from utils.encoding import (
+    TYPED_ARRAY_MIN_LENGTH,
+    encode_figure,
+    serialize_figure,
+    typed_array,
+)
+
+
+def decode(spec):
+    array = np.frombuffer(
+        base64.b64decode(spec["bdata"]), dtype=np.dtype(spec["dtype"]).newbyteorder("<")
+    )
+    if "shape" in spec:
+        array = array.reshape([int(n) for n in spec["shape"].split(",")])
+    return array
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        (np.arange(-100, 100), "i1"),
+        (np.arange(0, 250), "u1"),
+        (np.arange(0, 70_000), "i4"),
+        (np.linspace(0, 1, 33, dtype="f4").astype("f8"), "f4"),
+        (np.linspace(0, 1, 30), "f8"),
+        (np.array([1.5, np.nan, 3.0]), "f4"),
+        (np.array([0.1, np.nan]), "f8"),
+    ],
+)
+def test_typed_array_round_trip(values, dtype):
+    spec = typed_array(values)
+    assert spec["dtype"] == dtype
+    assert "shape" not in spec
+    np.testing.assert_array_equal(decode(spec), values)
+
+
+def test_typed_array_2d_keeps_shape():
+    values = np.arange(12, dtype=float).reshape(3, 4).T
+    spec = typed_array(values)
+    assert spec["shape"] == "4,3"
+    np.testing.assert_array_equal(decode(spec), values)
+
+
+def test_typed_array_wide_integers_stay_exact():
+    # Hasta 2**53 f8 es exacto; por encima se deja la lista JSON
+    values = np.array([2**40, 2**53, -5], dtype="i8")
+    spec = typed_array(values)
+    assert spec["dtype"] == "f8"
+    np.testing.assert_array_equal(decode(spec), values)
+
+    ids = np.array([2**53 + 1, 2**62, 7], dtype="i8")
+    assert typed_array(ids) == [2**53 + 1, 2**62, 7]
+
+
+def test_encode_figure_keeps_wide_integer_lists():
+    ids = [2**60 + i for i in range(TYPED_ARRAY_MIN_LENGTH)]
+    encoded = encode_figure({"data": [{"type": "scatter", "x": ids}]})
+    assert encoded["data"][0]["x"] == ids
+
+
+def test_typed_array_forced_dtype_casts():
+    values = np.array([0.1, 0.2, 0.3])
+    spec = typed_array(values, dtype="f4")
+    assert spec["dtype"] == "f4"
+    np.testing.assert_array_equal(decode(spec), values.astype("f4"))
+
+
+def test_encode_figure_encodes_only_long_numeric_trace_arrays():
+    n = TYPED_ARRAY_MIN_LENGTH
+    fig = {
+        "data": [
+            {
+                "x": list(range(n)),
+                "y": [float(v) if v % 3 else None for v in range(n)],
+                "z": [[1, 2]] * n,
+                "text": [str(v) for v in range(n)],
+                "short": list(range(n - 1)),
+                "flags": [True] * n,
+            }
+        ],
+        "layout": {"xaxis": {"tickvals": list(range(n))}},
+    }
+    encoded = encode_figure(fig)
+    trace = encoded["data"][0]
+    np.testing.assert_array_equal(decode(trace["x"]), np.arange(n))
+    y = decode(trace["y"])
+    assert np.isnan(y[::3]).all()
+    np.testing.assert_array_equal(y[1::3], np.arange(n)[1::3])
+    np.testing.assert_array_equal(decode(trace["z"]), np.full((n, 2), [1, 2]))
+    assert trace["text"] == fig["data"][0]["text"]
+    assert trace["short"] == fig["data"][0]["short"]
+    assert trace["flags"] == fig["data"][0]["flags"]
+    # El layout no se toca
+    assert encoded["layout"] is fig["layout"]
+
+
+def test_encode_figure_leaves_skip_keys_as_lists():
+    n = TYPED_ARRAY_MIN_LENGTH
+    values = list(range(n))
+    colorscale = [[i / (n - 1), i] for i in range(n)]
+    fig = {
+        "data": [
+            {
+                "type": "parcoords",
+                "dimensions": [{"range": values, "values": values}],
+                "line": {"colorscale": colorscale, "color": values},
+            }
+        ]
+    }
+    trace = encode_figure(fig)["data"][0]
+    assert trace["dimensions"][0]["range"] == values
+    assert trace["line"]["colorscale"] == colorscale
+    np.testing.assert_array_equal(decode(trace["dimensions"][0]["values"]), values)
+    np.testing.assert_array_equal(decode(trace["line"]["color"]), values)
+
+
+def test_encode_figure_encodes_frames():
+    n = TYPED_ARRAY_MIN_LENGTH
+    fig = {
+        "data": [{"x": list(range(n))}],
+        "frames": [{"name": "a", "data": [{"x": list(range(n, 2 * n))}]}],
+    }
+    frame = encode_figure(fig)["frames"][0]
+    assert frame["name"] == "a"
+    np.testing.assert_array_equal(decode(frame["data"][0]["x"]), np.arange(n, 2 * n))
+
+
+def test_serialize_figure_is_compact_json():
+    x = np.linspace(0, 1, 100)
+    payload = serialize_figure(go.Figure(go.Scatter(x=x, y=x**2)))
+    assert ": " not in payload and ", " not in payload
+    trace = json.loads(payload)["data"][0]
+    np.testing.assert_allclose(decode(trace["x"]), x)
+    np.testing.assert_allclose(decode(trace["y"]), x**2)
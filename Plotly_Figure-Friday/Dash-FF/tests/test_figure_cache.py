@@ -0,0 +1,115 @@
+# test_figure_cache.py
+import threading
+import time
+
+import plotly.graph_objects as go
+
+from utils.cache import MemoryBackend
+from utils.figure_cache import FigureCache, dataset_signature, find_dataset_files
+
+
+def make_cache():
+    return FigureCache(MemoryBackend(1 << 20))
+
+
+def test_put_and_get_return_plain_dicts():
+    cache = make_cache()
+    assert cache.get(("viz1", 0, "none")) is None
+    stored = cache.put(("viz1", 0, "none"), go.Figure(go.Bar(x=[1, 2], y=[3, 4])))
+    assert cache.get(("viz1", 0, "none")) == stored
+    assert stored["data"][0]["type"] == "bar"
+    assert ("viz1", 0, "none") in cache
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_get_or_build_builds_once():
+    cache = make_cache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return go.Figure(go.Scatter(x=[1], y=[1]))
+
+    first = cache.get_or_build("key", build)
+    second = cache.get_or_build("key", build)
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_concurrent_get_or_build_is_single_flight():
+    cache = make_cache()
+    calls = []
+    start = threading.Barrier(4)
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return go.Figure(go.Scatter(x=[1], y=[2]))
+
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_build("key", build))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    # Cada petición cuenta una sola vez, también las que esperan
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 4
+
+
+def test_waiter_rebuilds_under_backend_lock_when_owner_fails():
+    locked = []
+
+    class RecordingBackend(MemoryBackend):
+        def lock(self, key):
+            locked.append(threading.current_thread().name)
+            return super().lock(key)
+
+    cache = FigureCache(RecordingBackend(1 << 20))
+    started = threading.Event()
+
+    def failing_build():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("fallo")
+
+    def owner():
+        try:
+            cache.get_or_build("key", failing_build)
+        except RuntimeError:
+            pass
+
+    thread = threading.Thread(target=owner, name="owner")
+    thread.start()
+    started.wait()
+    fig = cache.get_or_build("key", lambda: go.Figure(go.Bar(x=[1], y=[1])))
+    thread.join()
+    assert fig["data"][0]["type"] == "bar"
+    assert locked == ["owner", threading.current_thread().name]
+    assert cache.stats()["misses"] == 2
+
+
+def test_find_dataset_files(tmp_path):
+    module = tmp_path / "viz9.py"
+    module.write_text(
+        'a = "dataset/b.csv"\nb = pd.read_csv(\'dataset/a.parquet\')\nc = "dataset/b.csv"\n',
+        encoding="utf-8",
+    )
+    assert find_dataset_files(str(module)) == ["dataset/a.parquet", "dataset/b.csv"]
+
+
+def test_dataset_signature_changes_with_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a\n1\n")
+    before = dataset_signature([str(path)])
+    path.write_text("a\n1\n2\n")
+    assert dataset_signature([str(path)]) != before
+    assert dataset_signature([str(tmp_path / "missing.csv")])[0][1:] == (None, None)
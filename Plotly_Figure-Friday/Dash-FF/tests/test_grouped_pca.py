@@ -0,0 +1,59 @@
+# test_grouped_pca.py
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+
+from viz import viz3
+from viz.viz3 import grouped_pca
+
+
+def test_grouped_pca_matches_sklearn_per_group():
+    rng = np.random.default_rng(1)
+    n = 90
+    X = rng.normal(size=(n, 2)) @ [[3.0, 1.0], [0.5, 0.2]] + [50, 10]
+    groups = pd.Series(rng.choice([2012, 2015, 2020], size=n))
+
+    projected = grouped_pca(X, groups)
+    for year in groups.unique():
+        mask = (groups == year).to_numpy()
+        expected = PCA(n_components=2).fit_transform(X[mask])
+        np.testing.assert_allclose(projected[mask], expected, atol=1e-9)
+
+
+def test_grouped_pca_sign_convention():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(40, 2))
+    groups = np.repeat(["a", "b"], 20)
+    projected = grouped_pca(X, groups)
+    for group in ("a", "b"):
+        mask = groups == group
+        centered = X[mask] - X[mask].mean(axis=0)
+        # Proyección = centrado @ componentes: se recuperan las componentes
+        components = np.linalg.lstsq(centered, projected[mask], rcond=None)[0]
+        largest = np.argmax(np.abs(components), axis=0)
+        assert (components[largest, [0, 1]] > 0).all()
+
+
+def test_spiral_keeps_per_year_sort_order(monkeypatch):
+    # Muchos empates por año: el orden debe ser el de ordenar cada año aparte
+    rng = np.random.default_rng(3)
+    n = 300
+    df = pd.DataFrame(
+        {
+            "Country / Territory": [f"c{i}" for i in range(n)],
+            "ISO3": [f"C{i:02d}" for i in range(n)],
+            "Region": "AME",
+            "Year": rng.choice([2013, 2014], size=n),
+            "CPI score": rng.integers(0, 4, size=n).astype(float),
+            "Rank": np.arange(n),
+        }
+    )
+    monkeypatch.setattr(viz3, "load_dataset", lambda key: df.copy())
+    fig = viz3.graphScatter("plotly")
+
+    for year, trace in zip([2013, 2014], [fig.data[0], fig.frames[1].data[0]]):
+        expected = df[df["Year"] == year].sort_values(by="CPI score")
+        theta = np.linspace(2, 1440, len(expected), endpoint=False)
+        np.testing.assert_array_equal(trace.r, expected["CPI score"])
+        np.testing.assert_allclose(trace.theta, theta)
+        assert list(trace.hovertext) == list(expected["Country / Territory"])
@@ -0,0 +1,47 @@
+# test_metrics.py
+import time
+
+from utils import metrics
+from utils.metrics import Histogram, lap, stage, track
+
+
+def test_histogram_counts_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Prueba.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, stage="load")
+    text = histogram.render()
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="load",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="load",le="1"} 2' in text
+    assert 'test_seconds_bucket{stage="load",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="load"} 3' in text
+    assert 'test_seconds_sum{stage="load"} 5.55' in text
+
+
+def test_histogram_escapes_label_values():
+    histogram = Histogram("test_seconds", "Prueba.", ("viz",), buckets=(1,))
+    histogram.observe(0.5, viz='a"b\\c')
+    assert 'viz="a\\"b\\\\c"' in histogram.render()
+
+
+def test_track_splits_time_into_stages(monkeypatch):
+    histogram = Histogram("stage_test", "Prueba.", ("viz", "plot", "stage"))
+    monkeypatch.setattr(metrics, "stage_seconds", histogram)
+    with track("viz1", 0) as timer:
+        with stage("dataset_load"):
+            time.sleep(0.1)
+        time.sleep(0.02)
+        lap("transform")
+    stages = timer.stages
+    assert set(stages) == {"dataset_load", "transform", "callback"}
+    # La carga medida aparte no se cuenta otra vez en la vuelta
+    assert 0.1 <= stages["dataset_load"] < stages["callback"]
+    assert 0.02 <= stages["transform"] < 0.1
+    assert stages["callback"] >= stages["dataset_load"] + stages["transform"]
+    assert 'stage="transform"' in histogram.render()
+
+
+def test_stage_and_lap_outside_a_request_are_no_ops():
+    with stage("dataset_load"):
+        pass
+    lap("transform")
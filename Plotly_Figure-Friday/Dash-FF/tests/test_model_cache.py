@@ -0,0 +1,39 @@
+# test_model_cache.py
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import PolynomialFeatures
+
+from utils.model_cache import cached_call, cached_fit, cached_fit_transform, memory
+
+calls = []
+
+
+def squares(values, offset=0):
+    calls.append(1)
+    return np.asarray(values) ** 2 + offset
+
+
+def test_cached_call_runs_once_per_arguments():
+    memory.clear(warn=False)
+    calls.clear()
+    np.testing.assert_array_equal(cached_call(squares, [1, 2]), [1, 4])
+    np.testing.assert_array_equal(cached_call(squares, [1, 2]), [1, 4])
+    assert len(calls) == 1
+    np.testing.assert_array_equal(cached_call(squares, [1, 2], offset=1), [2, 5])
+    assert len(calls) == 2
+
+
+def test_cached_fit_matches_a_direct_fit():
+    X = np.arange(20, dtype=float).reshape(-1, 2)
+    y = X @ [1.5, -2.0] + 3
+    model = cached_fit(LinearRegression(), X, y)
+    again = cached_fit(LinearRegression(), X, y)
+    np.testing.assert_allclose(model.coef_, LinearRegression().fit(X, y).coef_)
+    np.testing.assert_allclose(again.predict(X), model.predict(X))
+
+
+def test_cached_fit_transform_returns_the_fitted_estimator():
+    X = np.arange(6, dtype=float).reshape(-1, 1)
+    poly, X_poly = cached_fit_transform(PolynomialFeatures(degree=2), X)
+    np.testing.assert_array_equal(X_poly, PolynomialFeatures(degree=2).fit_transform(X))
+    np.testing.assert_array_equal(poly.transform(X), X_poly)
@@ -0,0 +1,100 @@
+# test_network.py
+import networkx as nx
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils import network
+from utils.network import (
+    adjacency_matrix,
+    approximate_similarity_edges,
+    circular_layout,
+    edge_coordinates,
+    normalize_rows,
+    pagerank,
+    similarity_edges,
+)
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    X = rng.random((60, 5))
+    X[7] = 0.0  # fila nula: sin aristas
+    return X
+
+
+def brute_force_edges(X, threshold):
+    S = cosine_similarity(X)
+    rows, cols = np.nonzero(np.triu(S > threshold, k=1))
+    return rows, cols, S[rows, cols]
+
+
+def test_normalize_rows_matches_cosine_similarity(features):
+    Xn = normalize_rows(features)
+    np.testing.assert_allclose(Xn @ Xn.T, cosine_similarity(features), atol=1e-12)
+
+
+@pytest.mark.parametrize("chunk_elements", [1 << 23, 64])
+def test_similarity_edges_match_brute_force(features, monkeypatch, chunk_elements):
+    # Con bloques pequeños se recorren varias franjas de filas
+    monkeypatch.setattr(network, "CHUNK_ELEMENTS", chunk_elements)
+    rows, cols, weights = similarity_edges(features, 0.9)
+    expected = brute_force_edges(features, 0.9)
+    np.testing.assert_array_equal(rows, expected[0])
+    np.testing.assert_array_equal(cols, expected[1])
+    np.testing.assert_allclose(weights, expected[2])
+
+
+def test_max_neighbors_keeps_edges_among_the_top_of_either_end(features):
+    k = 3
+    rows, cols, _ = similarity_edges(features, 0.5, max_neighbors=k)
+    S = cosine_similarity(features)
+    np.fill_diagonal(S, -np.inf)
+    top = np.argsort(-S, axis=1)[:, :k]
+    expected = {
+        (min(i, j), max(i, j)) for i in range(len(S)) for j in top[i] if S[i, j] > 0.5
+    }
+    assert set(zip(rows.tolist(), cols.tolist())) == expected
+    assert all(rows < cols)
+
+
+def test_approximate_edges_are_exact_edges(features):
+    rows, cols, weights = approximate_similarity_edges(features, 0.9, window=8)
+    exact_rows, exact_cols, exact_weights = similarity_edges(features, 0.9)
+    exact = dict(zip(zip(exact_rows.tolist(), exact_cols.tolist()), exact_weights))
+    pairs = list(zip(rows.tolist(), cols.tolist()))
+    assert pairs
+    assert len(set(pairs)) == len(pairs)
+    for pair, weight in zip(pairs, weights):
+        assert pair in exact
+        assert weight == pytest.approx(exact[pair])
+
+
+def test_pagerank_matches_networkx(features):
+    rows, cols, weights = similarity_edges(features, 0.9)
+    n = len(features)
+    A = adjacency_matrix(rows, cols, weights, n)
+    assert (A != A.T).nnz == 0
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    graph.add_weighted_edges_from(zip(rows.tolist(), cols.tolist(), weights))
+    expected = nx.pagerank(graph, weight="weight")
+    np.testing.assert_allclose(pagerank(A), [expected[i] for i in range(n)], atol=1e-8)
+
+
+def test_pagerank_of_an_empty_graph():
+    assert (
+        len(pagerank(adjacency_matrix(np.array([]), np.array([]), np.array([]), 0)))
+        == 0
+    )
+
+
+def test_circular_layout_and_edge_coordinates():
+    x, y = circular_layout(4)
+    np.testing.assert_allclose(x, [1, 0, -1, 0], atol=1e-12)
+    np.testing.assert_allclose(y, [0, 1, 0, -1], atol=1e-12)
+    edge_x, edge_y = edge_coordinates(np.array([0, 1]), np.array([2, 3]), x, y)
+    np.testing.assert_allclose(edge_x, [1, -1, np.nan, 0, 0, np.nan], atol=1e-12)
+    np.testing.assert_allclose(edge_y, [0, 0, np.nan, 1, -1, np.nan], atol=1e-12)
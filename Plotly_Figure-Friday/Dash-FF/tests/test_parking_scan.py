@@ -0,0 +1,77 @@
+# test_parking_scan.py
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from viz import viz5
+from viz.viz5 import amount_cols, parse_violation_time, scan_violations
+
+
+def reference_hour(vtime):
+    # Versión fila a fila anterior a la lectura por lotes
+    if isinstance(vtime, str):
+        vtime = vtime.strip().upper().replace(" ", "")
+        match = re.match(r"^(\d{1,2}):(\d{2})([AP])$", vtime)
+        if match:
+            hour = int(match.group(1))
+            meridian = match.group(3)
+            if meridian == "P" and hour != 12:
+                hour += 12
+            elif meridian == "A" and hour == 12:
+                hour = 0
+            return hour
+    return None
+
+
+TIMES = [
+    "12:05A",
+    "12:30P",
+    "01:15P",
+    " 9:45a ",
+    "11:59 P",
+    "07:00",
+    "7:0A",
+    "",
+    None,
+    "13:00P",
+]
+
+
+def test_parse_violation_time_matches_reference():
+    hours = parse_violation_time(pa.array(TIMES, type=pa.string())).to_pylist()
+    assert hours == [reference_hour(t) for t in TIMES]
+
+
+@pytest.fixture
+def parking_parquet(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 500
+    df = pd.DataFrame(
+        {col: rng.choice(["0", "50", "65.5", "n/a"], size=n) for col in amount_cols}
+    )
+    df["Fine Amount"] = rng.choice(["35", "115"], size=n)
+    df["Violation"] = rng.choice(["PHTO SCHOOL ZN", "NO PARKING", None], size=n)
+    df["Violation Time"] = rng.choice(TIMES, size=n)
+    path = tmp_path / "violations.parquet"
+    df.to_parquet(path, index=False)
+    return str(path), df
+
+
+def test_scan_violations_matches_whole_file_groupby(parking_parquet, monkeypatch):
+    path, df = parking_parquet
+    # Varios lotes pequeños
+    monkeypatch.setattr(viz5, "BATCH_ROWS", 64)
+    grouped, hours = scan_violations(path)
+
+    df[amount_cols] = df[amount_cols].apply(pd.to_numeric, errors="coerce")
+    expected = df.groupby(amount_cols + ["Violation"]).size().reset_index(name="Count")
+    pd.testing.assert_frame_equal(grouped, expected)
+
+    df["Violation Hour"] = df["Violation Time"].apply(reference_hour)
+    expected_hours = (
+        df.groupby(["Violation", "Violation Hour"]).size().reset_index(name="count")
+    )
+    pd.testing.assert_frame_equal(hours, expected_hours, check_dtype=False)
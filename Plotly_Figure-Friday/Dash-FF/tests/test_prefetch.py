@@ -0,0 +1,61 @@
+# test_prefetch.py
+import threading
+import time
+
+from utils.prefetch import Prefetcher
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_runs_scheduled_tasks():
+    prefetcher = Prefetcher(2, 4)
+    built = []
+    prefetcher.schedule([(key, lambda key=key: built.append(key)) for key in "ab"])
+    assert wait_until(lambda: prefetcher.stats()["completed"] == 2)
+    assert sorted(built) == ["a", "b"]
+    assert prefetcher.stats()["pending"] == 0
+
+
+def test_waits_for_foreground_requests():
+    prefetcher = Prefetcher(1, 4)
+    built = threading.Event()
+    with prefetcher.foreground():
+        prefetcher.schedule([("a", built.set)])
+        assert not built.wait(0.1)
+    assert built.wait(2.0)
+
+
+def test_new_navigation_cancels_unwanted_tasks():
+    prefetcher = Prefetcher(1, 4)
+    built = []
+    with prefetcher.foreground():
+        prefetcher.schedule([("a", lambda: built.append("a"))])
+        prefetcher.schedule([("b", lambda: built.append("b"))])
+    assert wait_until(lambda: prefetcher.stats()["pending"] == 0)
+    assert built == ["b"]
+    assert prefetcher.stats()["cancelled"] == 1
+
+
+def test_limits_pending_tasks():
+    prefetcher = Prefetcher(1, 2)
+    with prefetcher.foreground():
+        prefetcher.schedule([(key, lambda: None) for key in "abcd"])
+        assert prefetcher.stats()["submitted"] == 2
+
+
+def test_failed_task_is_counted(capsys):
+    prefetcher = Prefetcher(1, 4)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    prefetcher.schedule([("a", fail)])
+    assert wait_until(lambda: prefetcher.stats()["failed"] == 1)
+    assert "boom" in capsys.readouterr().out
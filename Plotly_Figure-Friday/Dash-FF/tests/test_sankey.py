@@ -0,0 +1,89 @@
+# test_sankey.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sankey import sankey_links
+from viz import viz8
+from viz.viz8 import clean_column_names
+
+
+def reference_links(df, stages):
+    # groupby por cada par de etapas, como el Sankey original de viz8
+    links = pd.concat(
+        [
+            df.groupby([src, tgt], observed=True)
+            .size()
+            .reset_index(name="value")
+            .set_axis(["source", "target", "value"], axis=1)
+            for src, tgt in zip(stages, stages[1:])
+        ]
+    )
+    links = links[links["value"] > 0]
+    nodes = pd.unique(np.concatenate([links["source"], links["target"]]))
+    node_map = {node: i for i, node in enumerate(nodes)}
+    return (
+        nodes,
+        links["source"].map(node_map).to_numpy(),
+        links["target"].map(node_map).to_numpy(),
+        links["value"].to_numpy(),
+    )
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_sankey_links_match_groupby(categorical):
+    rng = np.random.default_rng(4)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "primary": rng.choice(["Technique", "Voyageur", "Autre", None], size=n),
+            "secondary": rng.choice(["Autre", "Malaise", "Panne", None], size=n),
+            "status": rng.choice(["Evacuated", "Not evacuated"], size=n),
+        }
+    )
+    if categorical:
+        # Categorías sin filas: no deben generar nodos ni enlaces
+        df = df.astype("category")
+        df["primary"] = df["primary"].cat.add_categories(["Sans objet"])
+    stages = ["primary", "secondary", "status"]
+
+    labels, source, target, value = sankey_links(df, stages)
+    expected = reference_links(df, stages)
+    assert list(labels) == list(expected[0])
+    np.testing.assert_array_equal(source, expected[1])
+    np.testing.assert_array_equal(target, expected[2])
+    np.testing.assert_array_equal(value, expected[3])
+    # "Autre" aparece en dos etapas y comparte nodo
+    assert list(labels).count("Autre") == 1
+
+
+def test_clean_column_names():
+    cols = pd.Index(
+        ["Cause primaire", "Année civile", "Ligne  d'incident", " Évacuation "]
+    )
+    assert list(clean_column_names(cols)) == [
+        "cause_primaire",
+        "annee_civile",
+        "ligne_dincident",
+        "evacuation",
+    ]
+
+
+def test_read_incidents_types_columns_and_evacuated_flag(tmp_path, monkeypatch):
+    path = tmp_path / "incidents.csv"
+    pd.DataFrame(
+        {
+            "Cause primaire": ["Technique", "Voyageur", "Technique", "Autre"],
+            "Cause secondaire": ["Panne", "Malaise", "Panne", "Autre"],
+            "Évacuation": ["0", "#", "Oui", None],
+            "Année civile": [2021, 2022, 2022, 2023],
+            "Ligne": ["Verte", "Orange", "Bleue", "Jaune"],
+        }
+    ).to_csv(path, index=False)
+    monkeypatch.setattr(viz8, "download_url", str(path))
+
+    df = viz8.read_incidents()
+    assert list(df.columns) == list(viz8.column_dtypes) + ["evacuated"]
+    assert isinstance(df["cause_primaire"].dtype, pd.CategoricalDtype)
+    assert str(df["annee_civile"].dtype) == "Int16"
+    assert df["evacuated"].tolist() == [False, False, True, pd.NA]
@@ -0,0 +1,71 @@
+# test_text_embedding.py
+import os
+
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils import text_embedding
+from utils.text_embedding import TokenStore, embed_texts, texts_digest
+
+TEXTS = [
+    "new single family dwelling with garage",
+    "interior alterations to existing office",
+    "new single family dwelling with garage",
+    "roof replacement",
+    "interior alterations to existing retail store",
+    "new deck addition to single family dwelling",
+    "roof replacement",
+    "roof replacement",
+    "demolition of existing garage",
+    "",
+]
+
+
+@pytest.fixture(autouse=True)
+def token_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_embedding, "TOKEN_STORE_DIR", str(tmp_path / "tokens"))
+    return tmp_path / "tokens"
+
+
+@pytest.mark.parametrize("max_features", [None, 5])
+def test_embed_texts_matches_dense_tfidf_pca(max_features):
+    dense = (
+        TfidfVectorizer(max_features=max_features, stop_words="english")
+        .fit_transform(TEXTS)
+        .toarray()
+    )
+    expected = PCA(n_components=2).fit_transform(dense)
+    result = embed_texts(TEXTS, "permits", max_features=max_features)
+    np.testing.assert_allclose(result, expected, atol=1e-12)
+
+
+def test_token_store_only_tokenizes_changes(token_dir, capsys):
+    analyzer = TfidfVectorizer().build_analyzer()
+    store = TokenStore("permits", analyzer)
+    counts = store.counts(["a roof", "a deck"])
+    assert counts[0] == {"roof": 1}
+    assert (store.added, store.removed) == (2, 0)
+    assert "vacío" in capsys.readouterr().out
+    assert os.path.exists(token_dir / "permits.pkl")
+
+    # Otro proceso (otra instancia) reutiliza el archivo
+    store = TokenStore("permits", analyzer)
+    store.counts(["a deck", "new garage"])
+    assert (store.added, store.removed) == (1, 1)
+    assert capsys.readouterr().out == ""
+
+
+def test_unreadable_token_store_is_rebuilt(token_dir, capsys):
+    os.makedirs(token_dir)
+    (token_dir / "permits.pkl").write_bytes(b"not a pickle")
+    store = TokenStore("permits", TfidfVectorizer().build_analyzer())
+    assert store.counts(["roof"]) == [{"roof": 1}]
+    assert store.added == 1
+    assert "ilegible" in capsys.readouterr().out
+
+
+def test_texts_digest_depends_on_content_and_order():
+    assert texts_digest(["a", "b"]) == texts_digest(["a", "b"])
+    assert texts_digest(["a", "b"]) != texts_digest(["b", "a"])
@@ -0,0 +1,86 @@
+# test_viz_loader.py
+import glob
+import os
+import sys
+from datetime import date
+
+import pytest
+
+from utils.viz_loader import LazyGraph, read_metadata, read_module_data
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATIC_MODULE = """
+from datetime import date
+import sys
+
+sys.modules["viz_test_imported"] = True
+
+project = "Figure Friday"
+date = date(2025, 8, 15)
+dataset_url = "https://example.com"
+
+
+def graphA(template):
+    return ("A", template)
+
+
+plots = [
+    {"title": "A", "subtitle": "first", "graph": graphA},
+]
+"""
+
+DYNAMIC_MODULE = """
+project = "Dynamic " + "title"
+
+
+def graphB(template):
+    return template
+
+
+plots = [{"title": "B", "graph": graphB}]
+"""
+
+
+def write_module(tmp_path, name, source):
+    path = tmp_path / f"{name}.py"
+    path.write_text(source, encoding="utf-8")
+    return str(path)
+
+
+def test_metadata_is_read_without_importing(tmp_path):
+    path = write_module(tmp_path, "viz_static", STATIC_MODULE)
+    module, metadata = read_metadata("viz_static", path)
+    assert metadata["project"] == "Figure Friday"
+    assert metadata["date"] == date(2025, 8, 15)
+    assert metadata["plots"][0]["subtitle"] == "first"
+    assert not module.loaded
+    assert "viz_test_imported" not in sys.modules
+
+    graph = metadata["plots"][0]["graph"]
+    assert isinstance(graph, LazyGraph)
+    assert graph.__name__ == "graphA"
+    assert graph("none") == ("A", "none")
+    assert module.loaded
+    sys.modules.pop("viz_test_imported", None)
+
+
+def test_non_literal_metadata_falls_back_to_import(tmp_path):
+    path = write_module(tmp_path, "viz_dynamic", DYNAMIC_MODULE)
+    with pytest.raises(ValueError):
+        read_metadata("viz_dynamic", path)
+    module, metadata = read_module_data("viz_dynamic", path)
+    assert module.loaded
+    assert metadata["project"] == "Dynamic title"
+    assert metadata["plots"][0]["graph"]("dark") == "dark"
+
+
+@pytest.mark.parametrize(
+    "path", sorted(glob.glob(os.path.join(BASE_DIR, "viz", "viz*.py")))
+)
+def test_repo_viz_modules_have_static_metadata(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    module, metadata = read_metadata(name, path)
+    assert metadata["plots"]
+    assert all(isinstance(plot["graph"], LazyGraph) for plot in metadata["plots"])
+    assert not module.loaded
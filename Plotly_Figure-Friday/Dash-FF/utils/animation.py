@@ -0,0 +1,64 @@
+# animation.py
+# Controles de animación (botones play/stop y slider) iguales a los que
+# genera plotly.express, para figuras animadas construidas con go y frames
+# compactos: cada frame lleva solo los atributos que cambian.
+
+
+def _animate_args(duration, redraw):
+    return {
+        "frame": {"duration": duration, "redraw": redraw},
+        "mode": "immediate",
+        "fromcurrent": True,
+        "transition": {"duration": duration, "easing": "linear"},
+    }
+
+
+def animation_controls(frame_names, label, redraw=True):
+    """
+    updatemenus y sliders del layout para recorrer los frames frame_names.
+    """
+    updatemenus = [
+        {
+            "buttons": [
+                {
+                    "args": [None, _animate_args(500, redraw)],
+                    "label": "&#9654;",
+                    "method": "animate",
+                },
+                {
+                    "args": [[None], _animate_args(0, redraw)],
+                    "label": "&#9724;",
+                    "method": "animate",
+                },
+            ],
+            "direction": "left",
+            "pad": {"r": 10, "t": 70},
+            "showactive": False,
+            "type": "buttons",
+            "x": 0.1,
+            "xanchor": "right",
+            "y": 0,
+            "yanchor": "top",
+        }
+    ]
+    sliders = [
+        {
+            "active": 0,
+            "currentvalue": {"prefix": f"{label}="},
+            "len": 0.9,
+            "pad": {"b": 10, "t": 60},
+            "steps": [
+                {
+                    "args": [[name], _animate_args(0, redraw)],
+                    "label": name,
+                    "method": "animate",
+                }
+                for name in frame_names
+            ],
+            "x": 0.1,
+            "xanchor": "left",
+            "y": 0,
+            "yanchor": "top",
+        }
+    ]
+    return updatemenus, sliders
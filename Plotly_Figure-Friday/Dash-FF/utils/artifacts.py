@@ -0,0 +1,91 @@
+# artifacts.py
+import glob
+import hashlib
+import json
+import os
+import threading
+
+from utils.encoding import ENCODING_VERSION
+
+ARTIFACTS_DIR = os.environ.get("FIGURE_ARTIFACTS_DIR", "artifacts")
+TEMPLATES = ("plotly_dark", "none")
+# Las funciones de gráfico usan los auxiliares de utils/: su código también
+# forma parte del hash
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """
+    sha256 del contenido de un archivo, memorizado por (mtime, tamaño).
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _digests_lock:
+            _digests[key] = digest
+    return digest
+
+
+def artifact_hash(module_path, dataset_paths, template):
+    """
+    Hash de contenido de una figura: código del módulo viz (función de
+    gráfico y sus auxiliares), del paquete utils, versión del formato de
+    codificación, bytes de los datasets de entrada y plantilla.
+    """
+    h = hashlib.sha256()
+    h.update(file_digest(module_path).encode())
+    for path in sorted(glob.glob(os.path.join(UTILS_DIR, "*.py"))):
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    h.update(f"encoding-v{ENCODING_VERSION}".encode())
+    for path in dataset_paths:
+        h.update(path.encode())
+        h.update(file_digest(path).encode() if os.path.exists(path) else b"-")
+    h.update(template.encode())
+    return h.hexdigest()[:16]
+
+
+def artifact_path(viz_key, plot_index, template, digest, artifacts_dir=None):
+    artifacts_dir = artifacts_dir or ARTIFACTS_DIR
+    return os.path.join(
+        artifacts_dir, f"{viz_key}_{plot_index}_{template}_{digest}.json"
+    )
+
+
+def write_artifact(path, payload):
+    """
+    Escribe el JSON de la figura de forma atómica y elimina versiones previas.
+    """
+    prefix = path.rsplit("_", 1)[0]
+    for stale in glob.glob(f"{glob.escape(prefix)}_*.json"):
+        if stale != path:
+            os.remove(stale)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(viz_key, plot_index, template, module_path, dataset_paths):
+    """
+    Figura precalculada (dict) si existe un artefacto vigente; si no, None.
+    """
+    if not os.path.isdir(ARTIFACTS_DIR):
+        return None
+    digest = artifact_hash(module_path, dataset_paths, template)
+    path = artifact_path(viz_key, plot_index, template, digest)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,270 @@
+# cache.py
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# "memory": caché propia de cada proceso; "sqlite": compartida por los
+# workers de gunicorn de la misma máquina.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.environ.get("CACHE_SQLITE_PATH", "cache/cache.sqlite")
+CACHE_MAX_MB = float(
+    os.environ.get("CACHE_MAX_MB", os.environ.get("FIGURE_CACHE_MAX_MB", 256))
+)
+
+
+def cache_key(*parts):
+    """
+    Clave de texto estable a partir de tuplas/listas de valores simples.
+    """
+    return json.dumps(parts, default=str, separators=(",", ":"))
+
+
+class LatencyStats:
+    """
+    Número de operaciones y latencia (total y máxima) por tipo de operación.
+    """
+
+    def __init__(self):
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, op):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                count, total, worst = self._ops.get(op, (0, 0.0, 0.0))
+                self._ops[op] = (count + 1, total + elapsed, max(worst, elapsed))
+
+    def summary(self):
+        with self._lock:
+            return {
+                op: {
+                    "count": count,
+                    "avg_ms": total / count if count else 0.0,
+                    "max_ms": worst,
+                }
+                for op, (count, total, worst) in self._ops.items()
+            }
+
+
+class MemoryBackend:
+    """
+    LRU en memoria del proceso, acotada en bytes.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.latency = LatencyStats()
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self.latency.measure("get"), self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.latency.measure("set"), self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def lock(self, key):
+        # Dentro del proceso ya lo resuelve FigureCache (single-flight)
+        return nullcontext()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "latency": self.latency.summary(),
+            }
+
+
+class SQLiteBackend:
+    """
+    Caché en un archivo SQLite (modo WAL) compartido entre procesos del host.
+    Las entradas menos usadas se eliminan al superar el tamaño máximo y un
+    lock de archivo por clave evita que dos workers calculen lo mismo.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.latency = LatencyStats()
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock_dir = os.path.join(os.path.dirname(path) or ".", "locks")
+        os.makedirs(self._lock_dir, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+
+    def _connection(self):
+        # Una conexión por hilo y proceso (los workers se crean con fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        with self.latency.measure("get"):
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            return row[0]
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self.latency.measure("set"):
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, accessed)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM cache WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def contains(self, key):
+        row = (
+            self._connection()
+            .execute("SELECT 1 FROM cache WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row is not None
+
+    @contextmanager
+    def lock(self, key):
+        if fcntl is None:
+            yield
+            return
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with open(os.path.join(self._lock_dir, f"{digest}.lock"), "w") as f:
+            with self.latency.measure("lock"):
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+    def stats(self):
+        entries, size = (
+            self._connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache")
+            .fetchone()
+        )
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "latency": self.latency.summary(),
+        }
+
+
+def create_backend(name, max_bytes):
+    if name == "sqlite":
+        os.makedirs(os.path.dirname(CACHE_SQLITE_PATH) or ".", exist_ok=True)
+        return SQLiteBackend(CACHE_SQLITE_PATH, max_bytes)
+    if name != "memory":
+        print(f"CACHE_BACKEND desconocido '{name}', se usa 'memory'.")
+    return MemoryBackend(max_bytes)
+
+
+cache_backend = create_backend(CACHE_BACKEND, int(CACHE_MAX_MB * 1024 * 1024))
+
+
+def cached_aggregate(name, key_parts, compute):
+    """
+    Agregados derivados (DataFrames, arrays...) en el mismo backend que las
+    figuras, serializados con pickle. key_parts debe cambiar con los datos.
+    """
+    key = cache_key("aggregate", name, key_parts)
+    payload = cache_backend.get(key)
+    if payload is not None:
+        return pickle.loads(payload)
+    with cache_backend.lock(key):
+        payload = cache_backend.get(key)
+        if payload is not None:
+            return pickle.loads(payload)
+        value = compute()
+        cache_backend.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        return value
@@ -0,0 +1,153 @@
+# datasets.py
+import os
+import threading
+import time
+
+import pandas as pd
+
+from utils.metrics import stage
+
+DATASET_CACHE_MAX_MB = float(os.environ.get("DATASET_CACHE_MAX_MB", 512))
+DATASET_IDLE_SECONDS = float(os.environ.get("DATASET_IDLE_SECONDS", 3600))
+
+
+def read_file(path, **read_kwargs):
+    """
+    Lee un dataset según su extensión (parquet o csv).
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, engine="pyarrow", **read_kwargs)
+    return pd.read_csv(path, **read_kwargs)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DatasetRegistry:
+    """
+    Registro de datasets compartido por todo el proceso.
+    Cada archivo se parsea una sola vez, se recarga si cambia en disco y los
+    datasets inactivos se descartan al superar el presupuesto de memoria.
+    """
+
+    def __init__(self, max_bytes, idle_seconds):
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._names = {}
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def register(self, name, path, **read_kwargs):
+        """
+        Asocia un nombre lógico a una ruta (y a sus parámetros de lectura).
+        """
+        self._names[name] = (path, read_kwargs)
+
+    def _resolve(self, name_or_path, read_kwargs):
+        if name_or_path in self._names:
+            path, registered_kwargs = self._names[name_or_path]
+            return path, {**registered_kwargs, **read_kwargs}
+        return name_or_path, read_kwargs
+
+    def get(self, name_or_path, **read_kwargs):
+        """
+        Devuelve una copia del DataFrame del dataset: el llamador puede
+        modificarla sin alterar la del registro.
+        """
+        path, read_kwargs = self._resolve(name_or_path, read_kwargs)
+        key = (path, repr(sorted(read_kwargs.items())))
+        signature = file_signature(path)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Un lock por dataset evita parsear dos veces el mismo archivo
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["signature"] == signature:
+                    entry["last_access"] = time.monotonic()
+                    self.hits += 1
+                    return entry["frame"].copy()
+
+            frame = read_file(path, **read_kwargs)
+            entry = {
+                "frame": frame,
+                "signature": signature,
+                "size": int(frame.memory_usage(deep=True).sum()),
+                "last_access": time.monotonic(),
+            }
+            with self._lock:
+                self._entries[key] = entry
+                self.loads += 1
+                self._evict(keep=key)
+            return frame.copy()
+
+    def _evict(self, keep):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if key != keep and now - entry["last_access"] > self.idle_seconds:
+                self._drop(key)
+
+        total = sum(entry["size"] for entry in self._entries.values())
+        idle_first = sorted(
+            (k for k in self._entries if k != keep),
+            key=lambda k: self._entries[k]["last_access"],
+        )
+        for key in idle_first:
+            if total <= self.max_bytes:
+                break
+            total -= self._drop(key)["size"]
+
+    def _drop(self, key):
+        """
+        Descarta la entrada y su lock (si ningún hilo lo está usando).
+        """
+        entry = self._entries.pop(key)
+        key_lock = self._key_locks.get(key)
+        if key_lock is not None and not key_lock.locked():
+            del self._key_locks[key]
+        self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks = {
+                key: key_lock
+                for key, key_lock in self._key_locks.items()
+                if key_lock.locked()
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "datasets": {
+                    path: entry["size"] for (path, _), entry in self._entries.items()
+                },
+                "size_bytes": sum(entry["size"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+dataset_registry = DatasetRegistry(
+    int(DATASET_CACHE_MAX_MB * 1024 * 1024), DATASET_IDLE_SECONDS
+)
+
+
+def register_dataset(name, path, **read_kwargs):
+    dataset_registry.register(name, path, **read_kwargs)
+
+
+def load_dataset(name_or_path, **read_kwargs):
+    with stage("dataset_load"):
+        return dataset_registry.get(name_or_path, **read_kwargs)
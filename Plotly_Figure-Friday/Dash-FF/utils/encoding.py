@@ -0,0 +1,128 @@
+# encoding.py
+import base64
+import json
+
+import numpy as np
+import plotly.io as pio
+
+# Versión del formato de los arrays codificados: se sube al cambiarlo para
+# invalidar los artefactos precalculados
+ENCODING_VERSION = 2
+
+# Arrays más cortos se dejan como listas JSON (no compensa codificarlos)
+TYPED_ARRAY_MIN_LENGTH = 16
+
+# Atributos con arrays que no son datos (info_array) y deben quedar como listas
+SKIP_KEYS = {"domain", "range", "constraintrange", "colorscale", "autorange"}
+
+INTEGER_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4")
+
+
+def _numeric_array(values):
+    """
+    ndarray numérico si values es una lista (o lista de listas de igual
+    longitud) de números, con None como hueco (NaN); None si no lo es.
+    """
+    first = values[0]
+    if isinstance(first, list):
+        if not all(isinstance(row, list) and len(row) == len(first) for row in values):
+            return None
+        flat = [v for row in values for v in row]
+    else:
+        flat = values
+    numbers = 0
+    for v in flat:
+        if v is None:
+            continue
+        if not isinstance(v, (int, float)) or isinstance(v, bool):
+            return None
+        numbers += 1
+    if not numbers:
+        return None
+    if numbers < len(flat):
+        return np.array(values, dtype="f8")
+    array = np.asarray(values)
+    return array if array.dtype.kind in "iuf" else None
+
+
+def _typed_dtype(array):
+    """
+    El dtype más compacto que representa array sin pérdida, o None si no
+    hay ninguno (enteros de más de 53 bits: plotly.js no tiene i8).
+    """
+    if array.dtype.kind == "f":
+        finite = array[np.isfinite(array)]
+        if finite.size < array.size:
+            # Los huecos (NaN) solo existen en coma flotante
+            return "f4" if np.array_equal(array.astype("f4"), array, True) else "f8"
+        if not np.array_equal(finite, np.round(finite)):
+            return "f4" if np.array_equal(array.astype("f4"), array) else "f8"
+    low, high = array.min(), array.max()
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(np.dtype(dtype))
+        if info.min <= low and high <= info.max:
+            return dtype
+    if array.dtype.kind in "iu" and max(-int(low), int(high)) > 2**53:
+        return None
+    return "f8"
+
+
+def typed_array(array, dtype=None):
+    """
+    Array de NumPy en la forma binaria de Plotly: {"dtype", "bdata", "shape"}.
+    Sin dtype se usa el más compacto sin pérdida (si no lo hay, se devuelve
+    la lista JSON de siempre); con dtype (p. ej. "f4") se convierte a ese
+    tipo aunque pierda precisión.
+    """
+    array = np.asarray(array)
+    dtype = dtype or _typed_dtype(array)
+    if dtype is None:
+        return array.tolist()
+    spec = {
+        "dtype": dtype,
+        "bdata": base64.b64encode(
+            np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder("<"))
+        ).decode("ascii"),
+    }
+    if array.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in array.shape)
+    return spec
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        return {
+            key: item if key in SKIP_KEYS else _encode(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        if len(value) >= TYPED_ARRAY_MIN_LENGTH:
+            array = _numeric_array(value)
+            if array is not None:
+                return typed_array(array)
+        return [_encode(item) for item in value]
+    return value
+
+
+def encode_figure(fig_dict):
+    """
+    Sustituye los arrays numéricos de las trazas (y de los frames de
+    animación) por arrays binarios base64; el layout no se modifica.
+    """
+    encoded = dict(fig_dict)
+    if "data" in fig_dict:
+        encoded["data"] = [_encode(trace) for trace in fig_dict["data"]]
+    if "frames" in fig_dict:
+        encoded["frames"] = [
+            {**frame, "data": [_encode(trace) for trace in frame.get("data", [])]}
+            for frame in fig_dict["frames"]
+        ]
+    return encoded
+
+
+def serialize_figure(fig):
+    """
+    JSON compacto de la figura (go.Figure o dict) con arrays binarios.
+    """
+    fig_dict = json.loads(pio.to_json(fig, validate=False))
+    return json.dumps(encode_figure(fig_dict), separators=(",", ":"))
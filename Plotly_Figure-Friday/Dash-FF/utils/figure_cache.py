@@ -0,0 +1,120 @@
+# figure_cache.py
+import json
+import os
+import re
+import threading
+
+from utils.cache import cache_backend, cache_key
+from utils.encoding import serialize_figure
+from utils.metrics import stage
+
+# Rutas de datasets referenciadas en el código de un módulo de visualización
+DATASET_PATTERN = re.compile(r"""["'](dataset/[^"']+)["']""")
+
+
+def find_dataset_files(file_path):
+    """
+    Devuelve las rutas de datasets ("dataset/...") usadas por un módulo viz.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        source = f.read()
+    return sorted(set(DATASET_PATTERN.findall(source)))
+
+
+def dataset_signature(paths):
+    """
+    Firma (ruta, mtime, tamaño) de los datasets; cambia si algún archivo cambia.
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+class FigureCache:
+    """
+    Caché de figuras serializadas sobre un backend (memoria o SQLite).
+    Las figuras se guardan como JSON (con arrays binarios) y se devuelven
+    como diccionarios, listos para pasarse a dcc.Graph.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._building = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        payload = self.backend.get(cache_key("figure", key))
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key, fig):
+        with stage("serialize"):
+            payload = serialize_figure(fig)
+            self.backend.set(cache_key("figure", key), payload)
+            return json.loads(payload)
+
+    def __contains__(self, key):
+        return self.backend.contains(cache_key("figure", key))
+
+    def get_or_build(self, key, build):
+        """
+        Devuelve la figura de la caché o la construye. Si otro hilo (p. ej. el
+        prefetch) u otro worker ya la está construyendo, espera su resultado.
+        """
+        fig = self.get(key)
+        if fig is not None:
+            return fig
+        with self._lock:
+            event = self._building.get(key)
+            owner = event is None
+            if owner:
+                event = self._building[key] = threading.Event()
+        if not owner:
+            event.wait()
+            # Misma petición: no se cuenta otro acierto ni otro fallo
+            return self._build_locked(key, build)
+        try:
+            return self._build_locked(key, build)
+        finally:
+            with self._lock:
+                del self._building[key]
+            event.set()
+
+    def _build_locked(self, key, build):
+        """
+        Construye la figura con el lock del backend, salvo que otro hilo o
+        proceso la haya terminado mientras se esperaba.
+        """
+        with self.backend.lock(cache_key("figure", key)):
+            payload = self.backend.get(cache_key("figure", key))
+            if payload is not None:
+                return json.loads(payload)
+            return self.put(key, build())
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+        stats.update(self.backend.stats())
+        return stats
+
+
+figure_cache = FigureCache(cache_backend)
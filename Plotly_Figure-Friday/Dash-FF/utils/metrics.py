@@ -0,0 +1,162 @@
+# metrics.py
+# Latencia por etapa de cada petición (carga de datasets, transformación,
+# construcción de la figura, serialización y callback completo), por módulo
+# viz e índice de gráfico, expuesta como histogramas en formato Prometheus.
+# Cada worker de gunicorn expone sus propias métricas.
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Límites de los buckets en segundos
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Histograma acumulado con etiquetas, al estilo de prometheus_client.
+    """
+
+    def __init__(self, name, documentation, labelnames, buckets=BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (key, list(counts), count, total)
+                for key, (counts, count, total) in self._series.items()
+            )
+        for key, counts, count, total in series:
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, key)
+            )
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}'
+                )
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+stage_seconds = Histogram(
+    "dashff_stage_seconds",
+    "Duración de cada etapa de construcción de un gráfico, en segundos.",
+    ("viz", "plot", "stage"),
+)
+
+
+class StageTimer:
+    """
+    Acumula la duración de las etapas de una petición. Las vueltas (lap)
+    reparten el tiempo transcurrido desde la anterior, descontando las
+    etapas medidas aparte (p. ej. la carga de datasets).
+    """
+
+    def __init__(self, viz, plot):
+        self.viz = viz
+        self.plot = plot
+        self.stages = defaultdict(float)
+        self.restart()
+
+    def restart(self):
+        self._mark = time.perf_counter()
+        self._measured = 0.0
+
+    def add(self, stage, seconds):
+        self.stages[stage] += seconds
+        self._measured += seconds
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] += max(now - self._mark - self._measured, 0.0)
+        self._mark = now
+        self._measured = 0.0
+
+
+_current = ContextVar("stage_timer", default=None)
+
+
+@contextmanager
+def track(viz, plot, total_stage="callback"):
+    """
+    Mide una petición completa (total_stage) y publica sus etapas al terminar.
+    """
+    timer = StageTimer(viz, plot)
+    token = _current.set(timer)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timer.stages[total_stage] = time.perf_counter() - start
+        for stage, seconds in timer.stages.items():
+            stage_seconds.observe(seconds, viz=viz, plot=plot, stage=stage)
+
+
+@contextmanager
+def stage(name):
+    """
+    Mide un bloque como la etapa name de la petición en curso (si la hay).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer = _current.get()
+        if timer is not None:
+            timer.add(name, time.perf_counter() - start)
+
+
+def restart():
+    """
+    Inicio de la construcción de la figura: las vueltas cuentan desde aquí.
+    """
+    timer = _current.get()
+    if timer is not None:
+        timer.restart()
+
+
+def lap(name):
+    """
+    Asigna a la etapa name el tiempo desde la vuelta anterior. Los gráficos
+    llaman a lap("transform") al terminar de preparar los datos.
+    """
+    timer = _current.get()
+    if timer is not None:
+        timer.lap(name)
+
+
+def render_metrics():
+    return stage_seconds.render()
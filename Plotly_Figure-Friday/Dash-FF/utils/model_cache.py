@@ -0,0 +1,58 @@
+# model_cache.py
+# Modelos de sklearn ajustados (y sus resultados) guardados en disco con
+# joblib.Memory. La clave es un hash de los arrays de entrada, de los
+# hiperparámetros del estimador y del código de la función, así que cada
+# ajuste se calcula una vez por versión del dataset y se comparte entre
+# procesos. Los estimadores con azar deben llevar random_state fijo.
+import os
+
+from joblib import Memory
+
+MODEL_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", "cache/models")
+MODEL_CACHE_MAX_MB = float(os.environ.get("MODEL_CACHE_MAX_MB", 256))
+
+memory = Memory(MODEL_CACHE_DIR, verbose=0)
+
+
+@memory.cache
+def _fit(estimator, X, y):
+    return estimator.fit(X, y)
+
+
+@memory.cache
+def _fit_transform(estimator, X, y):
+    output = estimator.fit_transform(X, y)
+    return estimator, output
+
+
+@memory.cache
+def _call(func, args, kwargs):
+    return func(*args, **kwargs)
+
+
+def cached_fit(estimator, X, y=None):
+    """
+    estimator.fit(X, y), leído de la caché si ya se ajustó con estos datos.
+    """
+    return _fit(estimator, X, y)
+
+
+def cached_fit_transform(estimator, X, y=None):
+    """
+    (estimador ajustado, estimator.fit_transform(X, y)) desde la caché.
+    """
+    return _fit_transform(estimator, X, y)
+
+
+def cached_call(func, *args, **kwargs):
+    """
+    func(*args, **kwargs) desde la caché (p. ej. mutual_info_regression).
+    """
+    return _call(func, args, kwargs)
+
+
+def reduce_cache():
+    """
+    Elimina los resultados menos usados por encima de MODEL_CACHE_MAX_MB.
+    """
+    memory.reduce_size(bytes_limit=int(MODEL_CACHE_MAX_MB * 1024 * 1024))
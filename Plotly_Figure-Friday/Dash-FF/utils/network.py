@@ -0,0 +1,189 @@
+# network.py
+# Redes de similitud (coseno) sin bucles de Python sobre pares de elementos:
+# aristas por encima de un umbral con productos matriciales por bloques,
+# matriz de adyacencia dispersa y PageRank sobre esa matriz.
+import numpy as np
+import scipy.sparse as sp
+
+# Similitudes por bloque en el cálculo exacto (filas del bloque × n)
+CHUNK_ELEMENTS = 1 << 23
+
+
+def normalize_rows(X):
+    """
+    Filas con norma 1 (las filas nulas quedan a cero), como cosine_similarity.
+    """
+    X = np.asarray(X, dtype=float)
+    norms = np.sqrt(np.einsum("ij,ij->i", X, X))
+    norms[norms < 10 * np.finfo(float).eps] = 1.0
+    return X / norms[:, np.newaxis]
+
+
+def _unique_pairs(rows, cols, weights, n):
+    """
+    Aristas no dirigidas (i < j) sin repetir, en orden (i, j).
+    """
+    low, high = np.minimum(rows, cols), np.maximum(rows, cols)
+    _, first = np.unique(low * n + high, return_index=True)
+    return low[first], high[first], weights[first]
+
+
+def _block_edges(block, start, threshold, max_neighbors):
+    """
+    Aristas de las filas start... de la matriz de similitud: con
+    max_neighbors, solo los vecinos más parecidos de cada fila.
+    """
+    n_rows, n = block.shape
+    block[np.arange(n_rows), np.arange(start, start + n_rows)] = -np.inf
+    if max_neighbors is None or max_neighbors >= n - 1:
+        # Todas las aristas, cada una una sola vez (triángulo superior)
+        block[np.tril_indices(n_rows, k=start, m=n)] = -np.inf
+        r, c = np.nonzero(block > threshold)
+        return r + start, c, block[r, c]
+    top = np.argpartition(block, n - max_neighbors, axis=1)[:, n - max_neighbors :]
+    values = np.take_along_axis(block, top, axis=1)
+    keep = values > threshold
+    r = np.repeat(np.arange(n_rows), max_neighbors).reshape(n_rows, -1)
+    return r[keep] + start, top[keep], values[keep]
+
+
+def similarity_edges(X, threshold, max_neighbors=None):
+    """
+    Pares (i, j), i < j, con similitud coseno > threshold, en orden (i, j),
+    y su similitud. Recorre la matriz de similitud por bloques de filas sin
+    formarla entera. Con max_neighbors, una arista se conserva si está entre
+    las max_neighbors más parecidas de alguno de sus extremos.
+    """
+    Xn = normalize_rows(X)
+    n = len(Xn)
+    chunk_rows = max(1, CHUNK_ELEMENTS // max(n, 1))
+    edges = [(np.empty(0, dtype=np.int64),) * 2 + (np.empty(0),)]
+    for start in range(0, n, chunk_rows):
+        block = Xn[start : start + chunk_rows] @ Xn.T
+        edges.append(_block_edges(block, start, threshold, max_neighbors))
+    rows, cols, weights = (np.concatenate(part) for part in zip(*edges))
+    if max_neighbors is not None:
+        rows, cols, weights = _unique_pairs(rows, cols, weights, n)
+    return rows.astype(np.int64), cols.astype(np.int64), weights
+
+
+def similarity_of(Xn, rows, cols, chunk=1 << 20):
+    """
+    Similitud coseno de los pares (rows[k], cols[k]) de filas normalizadas.
+    """
+    weights = np.empty(len(rows))
+    for start in range(0, len(rows), chunk):
+        i, j = rows[start : start + chunk], cols[start : start + chunk]
+        weights[start : start + chunk] = np.einsum("ij,ij->i", Xn[i], Xn[j])
+    return weights
+
+
+def approximate_similarity_edges(
+    X, threshold, max_neighbors=None, n_tables=8, n_bits=16, window=32, seed=0
+):
+    """
+    Variante aproximada para conjuntos grandes: en cada tabla los elementos
+    se ordenan por un hash de hiperplanos aleatorios (vectores parecidos
+    comparten bits) y solo se compara cada uno con los window siguientes.
+    Coste O(n · n_tables · window) en lugar de O(n²); puede perder aristas.
+    """
+    Xn = normalize_rows(X)
+    n = len(Xn)
+    rng = np.random.default_rng(seed)
+    bit_values = 1 << np.arange(n_bits, dtype=np.int64)
+    rows, cols = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for _ in range(n_tables):
+        planes = rng.standard_normal((Xn.shape[1], n_bits))
+        codes = ((Xn @ planes) > 0).astype(np.int64) @ bit_values
+        # Desempate aleatorio: los elementos idénticos no forman siempre
+        # las mismas ventanas
+        order = np.lexsort((rng.random(n), codes))
+        ordered = Xn[order]
+        for offset in range(1, min(window, n - 1) + 1):
+            sims = np.einsum("ij,ij->i", ordered[:-offset], ordered[offset:])
+            keep = np.nonzero(sims > threshold)[0]
+            rows.append(order[keep])
+            cols.append(order[keep + offset])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    rows, cols, _ = _unique_pairs(rows, cols, np.empty(len(rows)), n)
+    weights = similarity_of(Xn, rows, cols)
+    if max_neighbors is not None:
+        rows, cols, weights = _top_neighbors(rows, cols, weights, n, max_neighbors)
+    return rows, cols, weights
+
+
+def _top_neighbors(rows, cols, weights, n, max_neighbors):
+    """
+    Conserva las aristas que están entre las max_neighbors más fuertes de
+    alguno de sus dos extremos.
+    """
+    both = np.concatenate([rows, cols])
+    strength = np.concatenate([weights, weights])
+    edge_ids = np.tile(np.arange(len(rows)), 2)
+    # Por nodo y, dentro de cada nodo, de mayor a menor similitud
+    order = np.argsort(-strength)
+    order = order[np.argsort(both[order], kind="stable")]
+    counts = np.bincount(both, minlength=n)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, counts)
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[edge_ids[order[rank < max_neighbors]]] = True
+    return rows[keep], cols[keep], weights[keep]
+
+
+def adjacency_matrix(rows, cols, weights, n):
+    """
+    Matriz de adyacencia simétrica (CSR) de un grafo no dirigido.
+    """
+    return sp.coo_array(
+        (
+            np.concatenate([weights, weights]),
+            (np.concatenate([rows, cols]), np.concatenate([cols, rows])),
+        ),
+        shape=(n, n),
+        dtype=float,
+    ).asformat("csr")
+
+
+def pagerank(A, alpha=0.85, max_iter=100, tol=1.0e-6):
+    """
+    PageRank ponderado por iteración de potencias sobre la matriz dispersa,
+    con el mismo algoritmo que networkx.pagerank (nodos colgantes incluidos).
+    """
+    N = A.shape[0]
+    if N == 0:
+        return np.array([])
+    S = A.sum(axis=1)
+    S[S != 0] = 1.0 / S[S != 0]
+    Q = sp.csr_array(sp.spdiags(S.T, 0, *A.shape))
+    A = Q @ A
+
+    x = np.repeat(1.0 / N, N)
+    p = np.repeat(1.0 / N, N)
+    is_dangling = np.where(S == 0)[0]
+    for _ in range(max_iter):
+        xlast = x
+        x = alpha * (x @ A + sum(x[is_dangling]) * p) + (1 - alpha) * p
+        err = np.absolute(x - xlast).sum()
+        if err < N * tol:
+            return x
+    raise RuntimeError(f"PageRank no convergió en {max_iter} iteraciones")
+
+
+def circular_layout(n):
+    """
+    Coordenadas (x, y) de n nodos repartidos en un círculo.
+    """
+    angles = np.arange(n) * (2 * np.pi / n) if n else np.array([])
+    return np.cos(angles), np.sin(angles)
+
+
+def edge_coordinates(rows, cols, x, y):
+    """
+    Coordenadas de las aristas para un único trazo de líneas: x0, x1, None...
+    """
+    edge_x = np.full((len(rows), 3), np.nan)
+    edge_y = np.full((len(rows), 3), np.nan)
+    edge_x[:, 0], edge_x[:, 1] = x[rows], x[cols]
+    edge_y[:, 0], edge_y[:, 1] = y[rows], y[cols]
+    return edge_x.ravel(), edge_y.ravel()
@@ -0,0 +1,94 @@
+# prefetch.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 2))
+PREFETCH_MAX_PENDING = int(os.environ.get("PREFETCH_MAX_PENDING", 4))
+
+
+class Prefetcher:
+    """
+    Calcula figuras en segundo plano con un pool de hilos acotado.
+    Cada nueva navegación cancela las tareas pendientes que ya no interesan
+    y las tareas esperan a que no haya peticiones en primer plano.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self._pending = {}
+        self._wanted = set()
+        self._foreground = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    @contextmanager
+    def foreground(self):
+        """
+        Marca una petición en primer plano: el prefetch no arranca mientras dure.
+        """
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                self._idle.notify_all()
+
+    def schedule(self, tasks):
+        """
+        tasks: lista de (clave, función). Sustituye a lo programado antes.
+        """
+        wanted = {key for key, _ in tasks}
+        with self._lock:
+            self._wanted = wanted
+            for key, future in list(self._pending.items()):
+                if key not in wanted and future.cancel():
+                    del self._pending[key]
+                    self.cancelled += 1
+            for key, build in tasks:
+                if key in self._pending or len(self._pending) >= self.max_pending:
+                    continue
+                self._pending[key] = self._executor.submit(self._run, key, build)
+                self.submitted += 1
+
+    def _run(self, key, build):
+        try:
+            with self._lock:
+                self._idle.wait_for(lambda: self._foreground == 0)
+                # Cancelación cooperativa: la navegación ya cambió
+                if key not in self._wanted:
+                    self.cancelled += 1
+                    return
+            build()
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f"Prefetch fallido para {key}: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }
+
+
+prefetcher = Prefetcher(PREFETCH_WORKERS, PREFETCH_MAX_PENDING)
@@ -0,0 +1,55 @@
+# sankey.py
+# Nodos y enlaces de un diagrama Sankey a partir de columnas categóricas:
+# los conteos se hacen sobre los códigos enteros de cada etapa y solo las
+# categorías (no las filas) se traducen a nodos.
+import numpy as np
+import pandas as pd
+
+
+def _stage_codes(column):
+    """
+    Códigos (-1 = nulo) y categorías de una columna, categórica o no.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype("category")
+    return column.cat.codes.to_numpy(), column.cat.categories
+
+
+def sankey_links(df, stages):
+    """
+    (etiquetas, origen, destino, valor) del Sankey que encadena las columnas
+    stages: cada par de etapas consecutivas aporta un enlace por combinación
+    observada, con el número de filas como valor (filas con nulos fuera).
+    Las etiquetas iguales en etapas distintas comparten nodo. Los enlaces
+    siguen el orden de groupby por etapa y los nodos, el de aparición entre
+    orígenes y luego destinos.
+    """
+    codes, categories = zip(*(_stage_codes(df[stage]) for stage in stages))
+    labels = pd.Index(np.concatenate([cats.to_numpy() for cats in categories]))
+    labels = labels.unique()
+    # Nodo de cada categoría de cada etapa
+    node_of = [labels.get_indexer(cats) for cats in categories]
+
+    sources, targets, values = [], [], []
+    for k in range(len(stages) - 1):
+        src, tgt = codes[k], codes[k + 1]
+        valid = (src >= 0) & (tgt >= 0)
+        n_tgt = len(categories[k + 1])
+        counts = np.bincount(
+            src[valid].astype(np.int64) * n_tgt + tgt[valid],
+            minlength=len(categories[k]) * n_tgt,
+        )
+        pairs = np.flatnonzero(counts)
+        sources.append(node_of[k][pairs // n_tgt])
+        targets.append(node_of[k + 1][pairs % n_tgt])
+        values.append(counts[pairs])
+
+    # Solo los nodos con enlaces, numerados por orden de aparición
+    appearance = np.concatenate(sources + targets)
+    used, first = np.unique(appearance, return_index=True)
+    used = used[np.argsort(first)]
+    renumber = np.empty(len(labels), dtype=np.int64)
+    renumber[used] = np.arange(len(used))
+    source = renumber[np.concatenate(sources)]
+    target = renumber[np.concatenate(targets)]
+    return labels.to_numpy()[used], source, target, np.concatenate(values)
@@ -0,0 +1,171 @@
+# text_embedding.py
+# Proyección 2-D (PCA sobre TF-IDF) de textos con muchos duplicados, sin
+# materializar la matriz densa filas × términos: se trabaja con los textos
+# únicos, ponderados por su número de apariciones, y en formato disperso.
+# El resultado es el mismo que TfidfVectorizer + PCA sobre todas las filas.
+import hashlib
+import os
+import pickle
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.model_cache import MODEL_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Un archivo por dataset, fuera de las cachés que descartan entradas
+TOKEN_STORE_DIR = os.path.join(MODEL_CACHE_DIR, "tokens")
+
+
+class TokenStore:
+    """
+    Conteo de tokens por texto, persistido en TOKEN_STORE_DIR. Al cambiar
+    el dataset solo se tokenizan los textos nuevos y se descartan los que ya
+    no aparecen (p. ej. una ventana móvil de 180 días).
+    """
+
+    def __init__(self, name, analyzer):
+        self.name = name
+        self.path = os.path.join(TOKEN_STORE_DIR, f"{name}.pkl")
+        self.analyzer = analyzer
+        self.added = 0
+        self.removed = 0
+
+    @contextmanager
+    def _lock(self):
+        os.makedirs(TOKEN_STORE_DIR, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Almacén de tokens '{self.name}' ilegible ({e}).")
+            return None
+
+    def _save(self, store):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def counts(self, texts):
+        with self._lock():
+            store = self._load()
+            if store is None:
+                print(
+                    f"Almacén de tokens '{self.name}' vacío: se tokenizan"
+                    f" {len(texts)} textos."
+                )
+                store = {}
+            wanted = set(texts)
+            stale = [text for text in store if text not in wanted]
+            for text in stale:
+                del store[text]
+            missing = [text for text in texts if text not in store]
+            for text in missing:
+                store[text] = Counter(self.analyzer(text))
+            if missing or stale:
+                self._save(store)
+            self.added, self.removed = len(missing), len(stale)
+        return [store[text] for text in texts]
+
+
+def _count_matrix(token_counts):
+    """
+    Matriz dispersa textos × términos (en orden alfabético, como sklearn).
+    """
+    terms = sorted({term for counts in token_counts for term in counts})
+    vocabulary = {term: index for index, term in enumerate(terms)}
+    indptr, indices, values = [0], [], []
+    for counts in token_counts:
+        indices.extend(vocabulary[term] for term in counts)
+        values.extend(counts.values())
+        indptr.append(len(indices))
+    X = sp.csr_matrix(
+        (np.asarray(values, dtype=np.int64), indices, indptr),
+        shape=(len(token_counts), len(terms)),
+    )
+    X.sort_indices()
+    return X
+
+
+def _tfidf(counts, weights, n_rows, max_features):
+    """
+    TF-IDF normalizado (L2) de los textos únicos, con la selección de términos
+    y el idf calculados como si cada texto apareciera weights[i] veces.
+    """
+    W = sp.diags(weights.astype(float))
+    tfs = np.asarray((W @ counts).sum(axis=0)).ravel()
+    if max_features is not None and counts.shape[1] > max_features:
+        # Mismo desempate que CountVectorizer._limit_features
+        keep = np.zeros(counts.shape[1], dtype=bool)
+        keep[(-tfs).argsort()[:max_features]] = True
+        counts = counts[:, np.where(keep)[0]]
+    dfs = np.asarray((W @ (counts > 0)).sum(axis=0)).ravel()
+    idf = np.log((1 + n_rows) / (1 + dfs)) + 1
+    tfidf = sp.csr_matrix(counts.astype(float) @ sp.diags(idf))
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0.0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms) @ tfidf)
+
+
+def _weighted_pca(Z, weights, n_components):
+    """
+    PCA (descomposición eigh de la covarianza, como PCA de sklearn) de las
+    filas de Z repetidas weights veces, sin densificar Z.
+    """
+    n = weights.sum()
+    mean = np.asarray(Z.T @ weights).ravel() / n
+    C = np.asarray((Z.T @ sp.diags(weights.astype(float)) @ Z).todense())
+    C -= n * np.outer(mean, mean)
+    C /= n - 1
+    _, vectors = np.linalg.eigh(C)
+    components = vectors[:, ::-1][:, :n_components]
+    # Criterio de signo de sklearn: la entrada de mayor valor absoluto, positiva
+    largest = np.argmax(np.abs(components), axis=0)
+    components = components * np.sign(components[largest, range(n_components)])
+    return np.asarray(Z @ components) - mean @ components
+
+
+def embed_texts(texts, name, max_features=500, stop_words="english", n_components=2):
+    """
+    Proyección (n_textos × n_components) de TfidfVectorizer + PCA sobre los
+    textos, calculada sobre los textos únicos. name identifica el almacén
+    de tokens del dataset.
+    """
+    codes, uniques = pd.factorize(pd.Series(texts), sort=False)
+    weights = np.bincount(codes, minlength=len(uniques))
+    analyzer = TfidfVectorizer(stop_words=stop_words).build_analyzer()
+    token_counts = TokenStore(name, analyzer).counts(list(uniques))
+    counts = _count_matrix(token_counts)
+    Z = _tfidf(counts, weights, len(codes), max_features)
+    return _weighted_pca(Z, weights, n_components)[codes]
+
+
+def texts_digest(texts):
+    """
+    Hash del contenido de una serie de textos (clave de caché).
+    """
+    return hashlib.sha1(
+        pd.util.hash_pandas_object(pd.Series(texts), index=False).values.tobytes()
+    ).hexdigest()
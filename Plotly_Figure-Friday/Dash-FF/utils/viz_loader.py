@@ -0,0 +1,157 @@
+# viz_loader.py
+import ast
+import importlib.util
+import threading
+import time
+from datetime import date
+
+from utils.metrics import stage
+
+METADATA_FIELDS = ("project", "project_title", "date", "detail_project", "dataset_url")
+
+# Tiempos de arranque por módulo (lectura de metadatos e importación real)
+startup_report = {}
+
+
+class LazyModule:
+    """
+    Módulo de visualización que solo se importa la primera vez que se usa.
+    """
+
+    def __init__(self, name, file_path):
+        self.name = name
+        self.file_path = file_path
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    with stage("module_import"):
+                        spec = importlib.util.spec_from_file_location(
+                            self.name, self.file_path
+                        )
+                        module = importlib.util.module_from_spec(spec)
+                        spec.loader.exec_module(module)
+                    startup_report.setdefault(self.name, {})["import_ms"] = (
+                        time.perf_counter() - start
+                    ) * 1000
+                    self._module = module
+        return self._module
+
+
+class LazyGraph:
+    """
+    Función de gráfico diferida: importa su módulo al ser llamada.
+    """
+
+    def __init__(self, module, func_name):
+        self.module = module
+        self.func_name = func_name
+        self.__name__ = func_name
+
+    def resolve(self):
+        return getattr(self.module.load(), self.func_name)
+
+    def __call__(self, template):
+        return self.resolve()(template)
+
+
+def _evaluate(node):
+    # Solo literales y llamadas date(año, mes, día)
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "date"
+    ):
+        return date(*[ast.literal_eval(arg) for arg in node.args])
+    return ast.literal_eval(node)
+
+
+def _evaluate_plots(node, module):
+    if not isinstance(node, ast.List):
+        raise ValueError("plots debe ser una lista literal")
+    plots = []
+    for item in node.elts:
+        if not isinstance(item, ast.Dict):
+            raise ValueError("cada plot debe ser un diccionario literal")
+        plot = {}
+        for key_node, value_node in zip(item.keys, item.values):
+            key = ast.literal_eval(key_node)
+            if key == "graph":
+                if not isinstance(value_node, ast.Name):
+                    raise ValueError("graph debe ser el nombre de una función")
+                plot[key] = LazyGraph(module, value_node.id)
+            else:
+                plot[key] = _evaluate(value_node)
+        plots.append(plot)
+    return plots
+
+
+def read_metadata(module_name, file_path):
+    """
+    Lee los metadatos de un módulo viz por análisis estático (sin importarlo).
+    Lanza ValueError si alguna asignación no es un literal evaluable.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+
+    module = LazyModule(module_name, file_path)
+    metadata = {}
+    for node in tree.body:
+        if not (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            continue
+        name = node.targets[0].id
+        if name in METADATA_FIELDS:
+            metadata[name] = _evaluate(node.value)
+        elif name == "plots":
+            metadata["plots"] = _evaluate_plots(node.value, module)
+    return module, metadata
+
+
+def read_module_data(module_name, file_path):
+    """
+    Metadatos de un módulo viz. Si el análisis estático no es posible,
+    se importa el módulo de inmediato como antes.
+    """
+    start = time.perf_counter()
+    try:
+        module, metadata = read_metadata(module_name, file_path)
+        startup_report.setdefault(module_name, {})["metadata_ms"] = (
+            time.perf_counter() - start
+        ) * 1000
+    except (ValueError, SyntaxError) as e:
+        print(f"Metadatos no estáticos en '{module_name}' ({e}); importando.")
+        module = LazyModule(module_name, file_path)
+        loaded = module.load()
+        metadata = {
+            field: getattr(loaded, field)
+            for field in METADATA_FIELDS
+            if hasattr(loaded, field)
+        }
+        metadata["plots"] = getattr(loaded, "plots", [])
+    return module, metadata
+
+
+def print_startup_report():
+    total = 0.0
+    print("Arranque de módulos viz:")
+    for name, report in sorted(startup_report.items()):
+        import_ms = report.get("import_ms")
+        total += report.get("metadata_ms", 0) + (import_ms or 0)
+        import_text = f"{import_ms:8.1f} ms" if import_ms is not None else "  diferida"
+        print(
+            f"  {name:<10} metadatos {report.get('metadata_ms', 0):7.1f} ms"
+            f" | importación {import_text}"
+        )
+    print(f"  total      {total:.1f} ms")
@@ -1,9 +1,15 @@
 import plotly.express as px
 from datetime import date
+import os
+import shutil
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.datasets import file_signature, load_dataset
+from utils.metrics import lap
 
 project = "Figure Friday 2025 - week 32"
 project_title = "Trends of Traffic at U.S. Borders"
@@ -14,31 +20,111 @@ dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-32/93588"
 
 download_url = "dataset/Border_Crossing_Entry_Data.parquet"
 
+# Cubo Year × Month × Border × Measure con la suma de Value, particionado por
+# año. Cada versión del parquet original tiene su propio directorio.
+CUBE_ROOT = os.path.join(
+    os.environ.get("BORDER_CUBE_DIR", "cache"), "border_crossing_cube"
+)
+
+month_order = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
+
+def build_cube(source, cube_dir):
+    """
+    Lee solo las columnas necesarias, parsea cada fecha distinta una vez y
+    guarda la suma mensual por frontera y medida en cube_dir.
+    """
+    table = pq.read_table(
+        source,
+        columns=["Date", "Border", "Measure", "Value"],
+        read_dictionary=["Date", "Border", "Measure"],
+    )
+    df = table.to_pandas()
+    dates = pd.to_datetime(df["Date"].cat.categories, format="%b %Y")
+    codes = df["Date"].cat.codes.to_numpy()
+    df["Year"] = dates.year.to_numpy()[codes]
+    df["Month"] = dates.month.to_numpy().astype("int8")[codes]
+    cube = (
+        df.groupby(["Year", "Month", "Border", "Measure"], observed=True)["Value"]
+        .sum()
+        .reset_index()
+    )
+
+    # Se escribe aparte y se publica con un solo rename atómico: nadie lee un
+    # cubo a medias. Si otro proceso publicó antes la misma versión, se usa
+    # la suya.
+    tmp_dir = f"{cube_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    pq.write_to_dataset(
+        pa.Table.from_pandas(cube, preserve_index=False),
+        tmp_dir,
+        partition_cols=["Year"],
+    )
+    try:
+        os.rename(tmp_dir, cube_dir)
+    except OSError:
+        if not os.path.isdir(cube_dir):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def cube_path(source, root=CUBE_ROOT):
+    """
+    Directorio del cubo para la versión actual (mtime, tamaño) de source.
+    """
+    mtime, size = file_signature(source)
+    return os.path.join(root, f"{mtime}_{size}.parquet")
+
+
+def remove_stale_cubes(current, root=CUBE_ROOT):
+    """
+    Borra los cubos de versiones anteriores del parquet original.
+    """
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path != current and name.endswith(".parquet"):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_cube():
+    """
+    Cubo mensual (Year, Month, Border, Measure, Value); lo construye si falta
+    o si el parquet original cambió.
+    """
+    cube_dir = cube_path(download_url)
+    if not os.path.isdir(cube_dir):
+        os.makedirs(CUBE_ROOT, exist_ok=True)
+        build_cube(download_url, cube_dir)
+        remove_stale_cubes(cube_dir)
+    cube = load_dataset(cube_dir)
+    cube["Year"] = cube["Year"].astype(int)
+    cube["Border"] = cube["Border"].astype(str)
+    cube["Measure"] = cube["Measure"].astype(str)
+    return cube
+
 
 def graphBarPolar(template):
-    df = pd.read_parquet(download_url, engine="pyarrow")
-    df["Date"] = pd.to_datetime(df["Date"], format="%b %Y")
-    df["Month_Name"] = df["Date"].dt.strftime("%b")
-    df["Year"] = df["Date"].dt.year
+    df = load_cube()
+    polar_data = df.groupby(["Year", "Month"])["Value"].sum().reset_index()
+    polar_data["Month_Name"] = np.array(month_order)[polar_data["Month"] - 1]
+    polar_data = polar_data.drop(columns="Month")
     years = df["Year"].unique()
-    month_order = [
-        "Jan",
-        "Feb",
-        "Mar",
-        "Apr",
-        "May",
-        "Jun",
-        "Jul",
-        "Aug",
-        "Sep",
-        "Oct",
-        "Nov",
-        "Dec",
-    ]
     all_months = pd.MultiIndex.from_product(
         [years, month_order], names=["Year", "Month_Name"]
     ).to_frame(index=False)
-    polar_data = df.groupby(["Year", "Month_Name"])["Value"].sum().reset_index()
     polar_data = pd.merge(
         all_months, polar_data, on=["Year", "Month_Name"], how="left"
     ).fillna(0)
@@ -49,6 +135,7 @@ def graphBarPolar(template):
     max_value = polar_data["Value"].max()
     min_value = polar_data["Value"].min()
 
+    lap("transform")
     fig = px.bar_polar(
         polar_data,
         r="Value",
@@ -81,9 +168,7 @@ def graphBarPolar(template):
 
 
 def graphBar(template):
-    df = pd.read_parquet(download_url, engine="pyarrow")
-    df["Date"] = pd.to_datetime(df["Date"], format="%b %Y")
-    df["Year"] = df["Date"].dt.year
+    df = load_cube()
 
     traffic_by_year_border = (
         df.groupby(["Year", "Border", "Measure"])["Value"].sum().reset_index()
@@ -98,11 +183,9 @@ def graphBar(template):
         .index
     )
 
-    traffic_by_year_border["Value_Plot"] = traffic_by_year_border.apply(
-        lambda row: (
-            row["Value"] if row["Border"] == "US-Mexico Border" else -row["Value"]
-        ),
-        axis=1,
+    traffic_by_year_border["Value_Plot"] = traffic_by_year_border["Value"].where(
+        traffic_by_year_border["Border"] == "US-Mexico Border",
+        -traffic_by_year_border["Value"],
     )
 
     max_value = traffic_by_year_border["Value"].max()
@@ -113,6 +196,7 @@ def graphBar(template):
         "US-Canada Border": "lightslategray",
     }
 
+    lap("transform")
     fig = px.bar(
         traffic_by_year_border,
         x="Value_Plot",
@@ -1,11 +1,19 @@
 import plotly.express as px
 from datetime import date
-import networkx as nx
 import plotly.graph_objects as go
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 import pandas as pd
 from sklearn.feature_selection import mutual_info_regression
+from utils.datasets import load_dataset, register_dataset
+from utils.metrics import lap
+from utils.model_cache import cached_call
+from utils.network import (
+    adjacency_matrix,
+    approximate_similarity_edges,
+    circular_layout,
+    edge_coordinates,
+    pagerank as network_pagerank,
+    similarity_edges,
+)
 
 project = "Figure Friday 2025 - week 31"
 project_title = "Candy Ranking: The FiveThirtyEight Experiment."
@@ -16,10 +24,16 @@ detail_project = (
 dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-31/93506"
 
 url = "dataset/candy-data.csv"
+register_dataset("candy", url)
+
+# Con más elementos, cada uno se une solo a sus vecinos más parecidos,
+# buscados de forma aproximada (ver network_benchmark.py)
+APPROXIMATE_ABOVE = 5000
+MAX_NEIGHBORS = 20
 
 
 def graphNetwork(template):
-    df = pd.read_csv(url)
+    df = load_dataset("candy")
     features = [
         "chocolate",
         "fruity",
@@ -34,47 +48,24 @@ def graphNetwork(template):
         "pricepercent",
     ]
     X = df[features].values
-    sim_matrix = cosine_similarity(X)
     threshold = 0.85
-    G = nx.Graph()
-    for i, row in df.iterrows():
-        G.add_node(i, label=row["competitorname"], winpercent=row["winpercent"])
-
-    for i in range(len(df)):
-        for j in range(i + 1, len(df)):
-            if sim_matrix[i, j] > threshold:
-                G.add_edge(i, j, weight=sim_matrix[i, j])
-
-    pagerank = nx.pagerank(G)
-    num_nodes = len(G.nodes)
-    angle_step = 2 * np.pi / num_nodes
-    node_pos = {
-        n: (np.cos(i * angle_step), np.sin(i * angle_step))
-        for i, n in enumerate(G.nodes)
-    }
-    node_x, node_y, node_text, node_color, node_size = [], [], [], [], []
-    for n in G.nodes():
-        x, y = node_pos[n]
-        node_x.append(x)
-        node_y.append(y)
-        label = G.nodes[n]["label"]
-        winp = G.nodes[n]["winpercent"]
-        node_text.append(
-            f"<b>{label}</b><br>Win%: {winp:.2f}<br>PageRank: {pagerank[n]:.4f}"
+    if len(df) > APPROXIMATE_ABOVE:
+        rows, cols, weights = approximate_similarity_edges(
+            X, threshold, max_neighbors=MAX_NEIGHBORS
         )
-        node_color.append(pagerank[n])
-
-        size = 10 + 40 * (
-            (winp - df["winpercent"].min())
-            / (df["winpercent"].max() - df["winpercent"].min())
-        )
-        node_size.append(size)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = node_pos[edge[0]]
-        x1, y1 = node_pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
+    else:
+        rows, cols, weights = similarity_edges(X, threshold)
+    pagerank = network_pagerank(adjacency_matrix(rows, cols, weights, len(df)))
+    node_x, node_y = circular_layout(len(df))
+    winp = df["winpercent"].to_numpy()
+    node_text = [
+        f"<b>{label}</b><br>Win%: {win:.2f}<br>PageRank: {rank:.4f}"
+        for label, win, rank in zip(df["competitorname"], winp, pagerank)
+    ]
+    node_color = pagerank
+    node_size = 10 + 40 * ((winp - winp.min()) / (winp.max() - winp.min()))
+    lap("transform")
+    edge_x, edge_y = edge_coordinates(rows, cols, node_x, node_y)
     edge_trace = go.Scatter(
         x=edge_x,
         y=edge_y,
@@ -114,7 +105,7 @@ def graphNetwork(template):
 
 
 def graphBar(template):
-    df = pd.read_csv(url)
+    df = load_dataset("candy")
     features = [
         "chocolate",
         "fruity",
@@ -130,7 +121,13 @@ def graphBar(template):
     ]
     X = df[features]
     y = df["winpercent"]
-    mi = mutual_info_regression(X, y, discrete_features=[True] * 9 + [False, False])
+    mi = cached_call(
+        mutual_info_regression,
+        X,
+        y,
+        discrete_features=[True] * 9 + [False, False],
+        random_state=0,
+    )
     mi_df = pd.DataFrame({"feature": features, "mutual_info": mi}).sort_values(
         by="mutual_info", ascending=True
     )
@@ -140,6 +137,7 @@ def graphBar(template):
         [0.6, "#a56a34"],
         [1.0, "#d9a15a"],
     ]
+    lap("transform")
     fig = px.bar(
         mi_df,
         x="mutual_info",
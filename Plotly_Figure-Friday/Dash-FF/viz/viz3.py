@@ -2,7 +2,8 @@ import plotly.express as px
 from datetime import date
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import PCA
+from utils.datasets import load_dataset, register_dataset
+from utils.metrics import lap
 
 
 project = "Figure Friday 2025 - week 28"
@@ -12,19 +13,29 @@ detail_project = "How has the perception of country-level corruption changed ove
 dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-28/93088"
 
 url = "dataset/CPI-historical.csv"
+register_dataset("cpi", url)
 
 
 def graphScatter(template):
-    df = pd.read_csv(url)
-    df_anim = []
-    for year in sorted(df["Year"].unique()):
-        df_year = df[df["Year"] == year].copy()
-        df_year = df_year.sort_values(by="CPI score")
-        df_year["r"] = df_year["CPI score"]
-        df_year["theta"] = np.linspace(2, 1440, len(df_year), endpoint=False)
-        df_anim.append(df_year)
-    df_spiral = pd.concat(df_anim, ignore_index=True)
+    df = load_dataset("cpi")
+    # Espiral por año: países ordenados por CPI, repartidos en 4 vueltas
+    # Mismo orden que ordenar cada año por separado (también en los empates):
+    # solo se ordenan las posiciones, sin copiar el DataFrame por año
+    scores = pd.Series(df["CPI score"].to_numpy())
+    order = np.concatenate(
+        [
+            group.sort_values().index
+            for _, group in scores.groupby(df["Year"].to_numpy())
+        ]
+    )
+    df_spiral = df.iloc[order].reset_index(drop=True)
+    df_spiral["r"] = df_spiral["CPI score"]
+    by_year = df_spiral.groupby("Year")
+    position = by_year.cumcount().to_numpy()
+    count = by_year["Year"].transform("size").to_numpy()
+    df_spiral["theta"] = position * ((1440 - 2) / count) + 2
     df_spiral["size"] = 50
+    lap("transform")
     fig = px.scatter_polar(
         df_spiral,
         r="r",
@@ -71,19 +82,43 @@ def graphScatter(template):
     return fig
 
 
+def grouped_pca(X, groups):
+    """
+    Proyección sobre las componentes principales de cada grupo, para todos
+    los grupos a la vez: una descomposición eigh de la covarianza de cada
+    grupo, apiladas, con el criterio de signo de sklearn (la entrada de
+    mayor valor absoluto de cada componente es positiva).
+    """
+    codes, _ = pd.factorize(groups)
+    counts = np.bincount(codes)
+    means = (
+        np.stack(
+            [np.bincount(codes, weights=X[:, j]) for j in range(X.shape[1])], axis=1
+        )
+        / counts[:, np.newaxis]
+    )
+    centered = X - means[codes]
+    products = centered[:, :, np.newaxis] * centered[:, np.newaxis, :]
+    cov = np.zeros((len(counts),) + products.shape[1:])
+    np.add.at(cov, codes, products)
+    cov /= (counts - 1)[:, np.newaxis, np.newaxis]
+    _, vectors = np.linalg.eigh(cov)
+    # eigh ordena de menor a mayor varianza
+    components = vectors[:, :, ::-1]
+    largest = np.argmax(np.abs(components), axis=1)[:, np.newaxis, :]
+    components = components * np.sign(np.take_along_axis(components, largest, axis=1))
+    return np.einsum("ni,nij->nj", centered, components[codes])
+
+
 def graphPCA(template):
-    df = pd.read_csv(url)
+    df = load_dataset("cpi")
     variables = ["CPI score", "Rank"]
     df = df.dropna(subset=variables)
-    pca_results = pd.DataFrame()
-    for year in sorted(df["Year"].unique()):
-        df_year = df[df["Year"] == year].copy()
-        X = df_year[variables].values
-        pca = PCA(n_components=2)
-        X_pca = pca.fit_transform(X)
-        df_year["PC1"] = X_pca[:, 0]
-        df_year["PC2"] = X_pca[:, 1]
-        pca_results = pd.concat([pca_results, df_year], axis=0)
+    pca_results = df.sort_values(by="Year", kind="stable")
+    scores = grouped_pca(pca_results[variables].to_numpy(), pca_results["Year"])
+    pca_results["PC1"] = scores[:, 0]
+    pca_results["PC2"] = scores[:, 1]
+    lap("transform")
     fig = px.scatter(
         pca_results,
         x="PC1",
@@ -7,6 +7,9 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from scipy.stats import zscore
+from utils.datasets import load_dataset, register_dataset
+from utils.metrics import lap
+from utils.model_cache import cached_fit, cached_fit_transform
 
 
 project = "Figure Friday 2025 - week 26"
@@ -17,11 +20,16 @@ date = date(2025, 7, 4)
 detail_project = "How has the unemployment rate changed over time? What has happened to the gender pay gap?"
 dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-28/93088"
 
+register_dataset("gender_parity", "dataset/gender-parity-in-managerial-positions.csv")
+register_dataset("gender_pay_gap", "dataset/gender-pay-gap.csv")
+register_dataset("labor_productivity", "dataset/labor-productivity.csv")
+register_dataset("unemployment", "dataset/unemployment.csv")
+
 
 def graphKuznetsCurve(template):
-    df_gender = pd.read_csv("dataset/gender-parity-in-managerial-positions.csv")
-    df_paygap = pd.read_csv("dataset/gender-pay-gap.csv")
-    df_productivity = pd.read_csv("dataset/labor-productivity.csv")
+    df_gender = load_dataset("gender_parity")
+    df_paygap = load_dataset("gender_pay_gap")
+    df_productivity = load_dataset("labor_productivity")
     df_gender.columns = ["Year", "Management_F", "Employment_F", "WorkingAge_F"]
     df_paygap.columns = [
         "Year",
@@ -54,9 +62,8 @@ def graphKuznetsCurve(template):
     X = df_clean["World_Productivity"].values.reshape(-1, 1)
     y = df_clean["World_PayGap"].values
 
-    poly = PolynomialFeatures(degree=2)
-    X_poly = poly.fit_transform(X)
-    model = LinearRegression().fit(X_poly, y)
+    poly, X_poly = cached_fit_transform(PolynomialFeatures(degree=2), X)
+    model = cached_fit(LinearRegression(), X_poly, y)
 
     x_vals = np.linspace(X.min(), X.max(), 100).reshape(-1, 1)
     x_vals_poly = poly.transform(x_vals)
@@ -70,6 +77,7 @@ def graphKuznetsCurve(template):
         ),
         (X.max(), y[np.argmax(X)]),
     ]
+    lap("transform")
     annotations = [
         dict(
             x=key_points[0][0],
@@ -138,8 +146,8 @@ def graphKuznetsCurve(template):
 
 
 def graphCompesationTheory(template):
-    df_productivity = pd.read_csv("dataset/labor-productivity.csv")
-    df_unemployment = pd.read_csv("dataset/unemployment.csv")
+    df_productivity = load_dataset("labor_productivity")
+    df_unemployment = load_dataset("unemployment")
     df_productivity.columns = [
         "Year",
         "World",
@@ -200,6 +208,7 @@ def graphCompesationTheory(template):
     index_z = prod_z.values - unemp_z.values
     df_index = pd.DataFrame(index_z, columns=regions)
     df_index["Year"] = merged["Year"]
+    lap("transform")
     fig = go.Figure()
     for region, color in zip(regions, colors):
         fig.add_trace(
@@ -239,17 +248,18 @@ def graphCompesationTheory(template):
 
 
 def graphParityProjection(template):
-    df_gender = pd.read_csv("dataset/gender-parity-in-managerial-positions.csv")
+    df_gender = load_dataset("gender_parity")
     for df in [df_gender]:
         df["Year"] = df["Year"].astype(int)
     df_gender.columns = ["Year", "Management_F", "Employment_F", "WorkingAge_F"]
     df = df_gender.dropna(subset=["Management_F"])
     X = df["Year"].values.reshape(-1, 1)
     y = df["Management_F"].values
-    model = LinearRegression().fit(X, y)
+    model = cached_fit(LinearRegression(), X, y)
     future_years = np.arange(df["Year"].min(), 2051).reshape(-1, 1)
     y_pred = model.predict(future_years)
     pred_2050 = y_pred[-1]
+    lap("transform")
     annotations = [
         dict(
             x=2050,
@@ -1,8 +1,13 @@
 import plotly.express as px
 from datetime import date
+import os
 import plotly.graph_objects as go
 import pandas as pd
-import re
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from utils.cache import cached_aggregate
+from utils.datasets import file_signature
+from utils.metrics import lap, stage
 
 
 project = "Figure Friday 2025 - week 24"
@@ -13,19 +18,96 @@ dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-24/92687"
 
 url = "dataset/Open_Parking_and_Camera_Violations.parquet"
 
+# Filas por lote al recorrer el parquet: acota la memoria de la ingesta
+BATCH_ROWS = int(os.environ.get("PARKING_BATCH_ROWS", 500_000))
+
+TIME_PATTERN = r"^(?P<hour>\d{1,2}):(?P<minute>\d{2})(?P<meridian>[AP])$"
+
+amount_cols = [
+    "Fine Amount",
+    "Penalty Amount",
+    "Interest Amount",
+    "Reduction Amount",
+    "Payment Amount",
+]
+
+
+def parse_violation_time(times):
+    """
+    Hora (0-23) de cada "hh:mmA"/"hh:mmP" de un array de Arrow; nulo si el
+    texto no tiene ese formato.
+    """
+    times = pc.replace_substring(pc.utf8_upper(pc.utf8_trim_whitespace(times)), " ", "")
+    parts = pc.extract_regex(times, TIME_PATTERN)
+    matched = pc.is_valid(parts)
+    hour = pc.cast(pc.if_else(matched, pc.struct_field(parts, 0), "0"), "int64")
+    meridian = pc.struct_field(parts, 2)
+    hour = pc.if_else(
+        pc.and_(pc.equal(meridian, "P"), pc.not_equal(hour, 12)),
+        pc.add(hour, 12),
+        pc.if_else(pc.and_(pc.equal(meridian, "A"), pc.equal(hour, 12)), 0, hour),
+    )
+    return pc.if_else(matched, hour, None)
+
+
+def _add_counts(total, counts):
+    return counts if total is None else total.add(counts, fill_value=0)
+
+
+def scan_violations(path):
+    """
+    Recorre el parquet por lotes y acumula los conteos de ambos gráficos:
+    (importes..., Violation) y (Violation, hora).
+    """
+    amount_counts = hour_counts = None
+    float_cols = set()
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(
+        batch_size=BATCH_ROWS,
+        columns=amount_cols + ["Violation", "Violation Time"],
+    ):
+        hours = parse_violation_time(batch.column("Violation Time"))
+        df = batch.select(amount_cols + ["Violation"]).to_pandas()
+        for col in amount_cols:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+            if df[col].dtype.kind != "i":
+                float_cols.add(col)
+        amount_counts = _add_counts(
+            amount_counts, df.groupby(amount_cols + ["Violation"]).size()
+        )
+        df_hours = pd.DataFrame(
+            {"Violation": df["Violation"], "Violation Hour": hours.to_pandas()}
+        )
+        hour_counts = _add_counts(
+            hour_counts, df_hours.groupby(["Violation", "Violation Hour"]).size()
+        )
+
+    amount_counts = amount_counts.sort_index().astype("int64")
+    hour_counts = hour_counts.sort_index().astype("int64")
+    grouped = amount_counts.reset_index(name="Count")
+    for col in amount_cols:
+        if col not in float_cols:
+            grouped[col] = grouped[col].astype("int64")
+    return grouped, hour_counts.reset_index(name="count")
+
+
+def violation_counts():
+    """
+    Conteos agregados del parquet, recalculados solo cuando el archivo cambia.
+    """
+    with stage("dataset_load"):
+        return cached_aggregate(
+            "parking_violations",
+            (url, file_signature(url)),
+            lambda: scan_violations(url),
+        )
+
 
 def graphParallel(template):
-    df = pd.read_parquet(url, engine="pyarrow")
-    cols = [
-        "Fine Amount",
-        "Penalty Amount",
-        "Interest Amount",
-        "Reduction Amount",
-        "Payment Amount",
-    ]
-    df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
-    grouped = df.groupby(cols + ["Violation"]).size().reset_index(name="Count")
+    grouped, _ = violation_counts()
+    cols = amount_cols
     grouped["Violation_Code"] = grouped["Violation"].astype("category").cat.codes
+    lap("transform")
     fig = px.parallel_coordinates(
         grouped,
         dimensions=cols,
@@ -41,28 +123,8 @@ def graphParallel(template):
     return fig
 
 
-def parse_violation_time(vtime):
-    if isinstance(vtime, str):
-        vtime = vtime.strip().upper().replace(" ", "")
-        match = re.match(r"^(\d{1,2}):(\d{2})([AP])$", vtime)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            meridian = match.group(3)
-            if meridian == "P" and hour != 12:
-                hour += 12
-            elif meridian == "A" and hour == 12:
-                hour = 0
-            return hour
-    return None
-
-
 def graphHeatmap(template):
-    df = pd.read_parquet(url, engine="pyarrow")
-    df["Violation Hour"] = df["Violation Time"].apply(parse_violation_time)
-    df_grouped = (
-        df.groupby(["Violation", "Violation Hour"]).size().reset_index(name="count")
-    )
+    _, df_grouped = violation_counts()
     df_pivot = df_grouped.pivot(
         index="Violation", columns="Violation Hour", values="count"
     ).fillna(0)
@@ -71,6 +133,7 @@ def graphHeatmap(template):
     df_z = (df_z - df_z.mean(axis=1).values.reshape(-1, 1)) / df_z.std(axis=1).replace(
         0, 1
     ).values.reshape(-1, 1)
+    lap("transform")
     fig = px.imshow(
         df_z,
         labels=dict(x="Hour of Day (1-24)", y="Violation Type", color="Z-score"),
@@ -3,8 +3,10 @@ from datetime import date
 import plotly.graph_objects as go
 import pandas as pd
 from urllib.request import urlopen
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import PCA
+from utils.datasets import load_dataset, register_dataset
+from utils.metrics import lap
+from utils.cache import cached_aggregate
+from utils.text_embedding import embed_texts, texts_digest
 
 
 project = "Figure Friday 2025 - week 25"
@@ -14,10 +16,11 @@ detail_project = "Honoring our first Plotly Meetup in Raleigh NC, led by @Thomas
 dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-25/92773"
 
 url = "dataset/Building_Permits_Issued_Past_180_Days.csv"
+register_dataset("building_permits", url)
 
 
 def graphBoxplot(template):
-    df = pd.read_csv(url)
+    df = load_dataset("building_permits")
     if "applieddate" in df.columns and "issueddate" in df.columns:
         df["applieddate"] = pd.to_datetime(df["applieddate"], errors="coerce")
         df["issueddate"] = pd.to_datetime(df["issueddate"], errors="coerce")
@@ -26,6 +29,7 @@ def graphBoxplot(template):
     df["days_to_issue"] = (df["issueddate"] - df["applieddate"]).dt.days
 
     df_plot = df[df["days_to_issue"] > 0].copy()
+    lap("transform")
     fig = go.Figure()
     fig.add_trace(
         go.Box(
@@ -51,7 +55,7 @@ def graphBoxplot(template):
 
 
 def graphNPL(template):
-    df = pd.read_csv(url)
+    df = load_dataset("building_permits")
     if "applieddate" in df.columns and "issueddate" in df.columns:
         df["applieddate"] = pd.to_datetime(df["applieddate"], errors="coerce")
         df["issueddate"] = pd.to_datetime(df["issueddate"], errors="coerce")
@@ -74,13 +78,17 @@ def graphNPL(template):
             return "slow"
 
     df_nlp["approval_speed"] = df_nlp["days_to_issue"].apply(classify_speed)
-    vectorizer = TfidfVectorizer(max_features=500, stop_words="english")
-    X_tfidf = vectorizer.fit_transform(df_nlp["description"])
-    pca = PCA(n_components=2)
-    X_reduced = pca.fit_transform(X_tfidf.toarray())
+    # TF-IDF + PCA sobre las descripciones únicas; se guarda por versión
+    descriptions = df_nlp["description"]
+    X_reduced = cached_aggregate(
+        "permit_embedding",
+        texts_digest(descriptions),
+        lambda: embed_texts(descriptions, "building_permits"),
+    )
     df_nlp["x"] = X_reduced[:, 0]
     df_nlp["y"] = X_reduced[:, 1]
     df_nlp["cost_scaled"] = df_nlp["estprojectcost"] / df_nlp["estprojectcost"].max()
+    lap("transform")
     fig = px.scatter(
         df_nlp,
         x="x",
@@ -104,6 +112,9 @@ def graphNPL(template):
         template=template,
     )
     fig.update_traces(marker=dict(opacity=0.7, line=dict(width=0)))
+    # Sin color explícito cada traza toma el de la colorway de la plantilla,
+    # que el cambio de tema por Patch actualiza en el cliente
+    fig.for_each_trace(lambda trace: trace.update(marker_color=None))
     fig.update_layout(
         xaxis=dict(
             range=[-0.5, 0.7],
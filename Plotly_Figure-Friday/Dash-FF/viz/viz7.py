@@ -1,11 +1,14 @@
 import plotly.express as px
 from datetime import date
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from urllib.request import urlopen
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import PCA
-
+from utils.animation import animation_controls
+from utils.datasets import load_dataset, register_dataset
+from utils.metrics import lap
 
 project = "Figure Friday 2025 - week 10"
 project_title = "Popular Programming Languages."
@@ -15,11 +18,13 @@ detail_project = (
 )
 dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-10/90890"
 
+register_dataset(
+    "languages", "dataset/Popularity of Programming Languages from 2004 to 2024.csv"
+)
+
 
 def graphCategory(template):
-    df = pd.read_csv(
-        "dataset/Popularity of Programming Languages from 2004 to 2024.csv"
-    )
+    df = load_dataset("languages")
     df["Date"] = pd.to_datetime(df["Date"])
     language_categories = {
         "JavaScript": "Web & Mobile Development",
@@ -74,6 +79,7 @@ def graphCategory(template):
     )
     df_long["Formatted Date"] = df_long["Date"].dt.strftime("%m/%Y")
     tick_vals = df_long[df_long["Date"].dt.month == 12]["Formatted Date"].unique()
+    lap("transform")
     fig = px.area(
         df_long,
         x="Formatted Date",
@@ -110,11 +116,10 @@ def graphCategory(template):
 
 
 def graphTernary(template):
-    df = pd.read_csv(
-        "dataset/Popularity of Programming Languages from 2004 to 2024.csv"
-    )
-    df["Date"] = pd.to_datetime(df["Date"])
-    df_long = df.melt(id_vars=["Date"], var_name="language", value_name="popularity")
+    df = load_dataset("languages")
+    dates = pd.to_datetime(df["Date"], format="%B %Y")
+    languages = list(df.columns.drop("Date"))
+    popularity = df[languages].to_numpy()
     paradigms = {
         "Abap": ["Imperativo", "Orientado a objetos"],
         "Ada": ["Imperativo", "Orientado a objetos"],
@@ -179,39 +184,6 @@ def graphTernary(template):
         "Visual Basic": ["Desktop", "Scripting", "Backend"],
     }
 
-    # Fechas de creación de los lenguajes
-    creation_dates = {
-        "Abap": "1983-01-01",
-        "Ada": "1980-01-01",
-        "C/C++": "1972-01-01",
-        "C#": "2000-01-01",
-        "Cobol": "1959-01-01",
-        "Dart": "2011-01-01",
-        "Delphi/Pascal": "1983-01-01",
-        "Go": "2007-01-01",
-        "Groovy": "2003-01-01",
-        "Haskell": "1990-01-01",
-        "Java": "1995-01-01",
-        "JavaScript": "1995-01-01",
-        "Julia": "2012-01-01",
-        "Kotlin": "2011-01-01",
-        "Lua": "1993-01-01",
-        "Matlab": "1984-01-01",
-        "Objective-C": "1984-01-01",
-        "Perl": "1987-01-01",
-        "PHP": "1995-01-01",
-        "Powershell": "2006-01-01",
-        "Python": "1991-01-01",
-        "R": "1993-01-01",
-        "Ruby": "1995-01-01",
-        "Rust": "2010-01-01",
-        "Scala": "2003-01-01",
-        "Swift": "2014-01-01",
-        "TypeScript": "2012-01-01",
-        "VBA": "1991-01-01",
-        "Visual Basic": "1991-01-01",
-    }
-
     # Fechas clave de tendencias
     TRENDS = {
         "Web": "1995-01-01",
@@ -226,54 +198,82 @@ def graphTernary(template):
         "Enterprise Applications": "1980-01-01",
     }
 
-    def update_categories(row):
-        base_categories = categories.get(row["language"], []).copy()
-        date = row["Date"]
-        filtered_categories = [
-            cat
-            for cat in base_categories
-            if date >= pd.Timestamp(TRENDS.get(cat, "1970-01-01"))
-        ]
-        return filtered_categories
-
-    df_long["detailCat"] = df_long.apply(
-        lambda row: ", ".join(update_categories(row)), axis=1
+    # Categorías activas de cada lenguaje en cada fecha: una categoría cuenta
+    # desde su fecha de tendencia (fechas × categorías) @ (categorías × lenguajes)
+    category_names = sorted({cat for cats in categories.values() for cat in cats})
+    trend_dates = pd.to_datetime(
+        [TRENDS.get(cat, "1970-01-01") for cat in category_names]
     )
-    df_long["categories"] = df_long["detailCat"].apply(
-        lambda x: len(x.split(", ")) if x else 0
-    )
-    df_long["paradigm"] = df_long["language"].map(lambda x: len(paradigms.get(x, [])))
-    df_long["created"] = df_long["language"].map(
-        lambda x: creation_dates.get(x, "Unknown")
-    )
-    df_long["detailParadigm"] = df_long["language"].map(
-        lambda x: ", ".join(paradigms.get(x, []))
-    )
-    df_long = df_long[
+    active = dates.to_numpy()[:, None] >= trend_dates.to_numpy()[None, :]
+    member = np.array(
         [
-            "Date",
-            "language",
-            "popularity",
-            "paradigm",
-            "categories",
-            "created",
-            "detailCat",
-            "detailParadigm",
+            [cat in categories.get(lang, []) for lang in languages]
+            for cat in category_names
         ]
+    )
+    category_counts = active.astype(int) @ member.astype(int)
+    paradigm_counts = [len(paradigms.get(lang, [])) for lang in languages]
+    frame_names = dates.dt.strftime("%b-%Y").tolist()
+    # Mismo escalado de tamaño que px (size_max=15)
+    sizeref = popularity.max() / 15**2
+    lap("transform")
+    traces = [
+        go.Scatterternary(
+            a=popularity[:1, i],
+            b=[paradigm_counts[i]],
+            c=category_counts[:1, i],
+            name=lang,
+            legendgroup=lang,
+            showlegend=True,
+            mode="markers",
+            # Sin color: la colorway de la plantilla lo asigna en el cliente y
+            # el cambio de tema por Patch lo actualiza, como en px
+            marker=dict(
+                size=popularity[:1, i],
+                sizemode="area",
+                sizeref=sizeref,
+                symbol="circle",
+            ),
+            # El mes de cada frame llega en meta, como en el hover de px
+            meta=frame_names[0],
+            hovertemplate=f"language={lang}<br>Date=%{{meta}}"
+            "<br>popularity=%{marker.size}<br>paradigm=%{b}<br>categories=%{c}"
+            "<extra></extra>",
+        )
+        for i, lang in enumerate(languages)
     ]
-    df_long["Date"] = pd.to_datetime(df_long["Date"])
-    df_long["Date"] = df_long["Date"].dt.strftime("%b-%Y")
-    fig = px.scatter_ternary(
-        df_long,
-        a="popularity",
-        b="paradigm",
-        c="categories",
-        animation_frame="Date",
+    # Frames compactos: solo lo que cambia de un mes a otro (a, c, tamaño y
+    # el mes que muestra el hover)
+    frames = [
+        dict(
+            name=name,
+            data=[
+                dict(
+                    type="scatterternary",
+                    a=popularity[k : k + 1, i],
+                    c=category_counts[k : k + 1, i],
+                    marker=dict(size=popularity[k : k + 1, i]),
+                    meta=name,
+                )
+                for i in range(len(languages))
+            ],
+        )
+        for k, name in enumerate(frame_names)
+    ]
+    updatemenus, sliders = animation_controls(frame_names, "Date")
+    fig = go.Figure(data=traces, frames=frames)
+    fig.update_layout(
         template=template,
         height=500,
-        size="popularity",
-        size_max=15,
-        color="language",
+        ternary=dict(
+            aaxis_title_text="popularity",
+            baxis_title_text="paradigm",
+            caxis_title_text="categories",
+        ),
+        legend=dict(title_text="language", tracegroupgap=0, itemsizing="constant"),
+        margin=dict(t=60),
+        updatemenus=updatemenus,
+        sliders=sliders,
     )
 
     return fig
@@ -2,6 +2,10 @@ import plotly.express as px
 from datetime import date
 import plotly.graph_objects as go
 import pandas as pd
+from utils.cache import cached_aggregate
+from utils.datasets import file_signature
+from utils.metrics import lap, stage
+from utils.sankey import sankey_links
 
 
 project = "Figure Friday 2025 - week 34"
@@ -14,35 +18,62 @@ dataset_url = "https://community.plotly.com/t/figure-friday-2025-week-34/93782"
 # file_id = url_original.split("/")[-2]
 download_url = "dataset/Incidents-du-reseau-du-metro.csv"
 
+# Columnas usadas (nombres ya limpios) y su tipo al leer el csv
+column_dtypes = {
+    "cause_primaire": "category",
+    "cause_secondaire": "category",
+    "evacuation": "string",
+    "annee_civile": "Int16",
+}
 
-def clean_column_names(df):
-    cols = df.columns
+
+def clean_column_names(cols):
     cols = cols.str.replace("'", "").str.replace(" ", "_").str.lower()
     cols = (
         cols.str.normalize("NFKD")
         .str.encode("ascii", errors="ignore")
         .str.decode("utf-8")
     )
-    cols = cols.str.replace("_+", "_", regex=True).str.strip("_")
-    df.columns = cols
+    return cols.str.replace("_+", "_", regex=True).str.strip("_")
+
+
+def read_incidents():
+    """
+    Lee solo las columnas usadas, ya tipadas, y añade la marca evacuated
+    ("0" y "#" significan sin evacuación; nulo si no hay dato).
+    """
+    header = pd.read_csv(download_url, nrows=0).columns
+    raw_names = dict(zip(clean_column_names(header), header))
+    df = pd.read_csv(
+        download_url,
+        usecols=[raw_names[col] for col in column_dtypes],
+        dtype={raw_names[col]: dtype for col, dtype in column_dtypes.items()},
+    )
+    df.columns = clean_column_names(df.columns)
+    evacuation = df["evacuation"]
+    df["evacuated"] = (~evacuation.isin(["0", "#"])).astype("boolean")
+    df.loc[evacuation.isna(), "evacuated"] = pd.NA
     return df
 
 
-def pad_text(text, length):
-    return " " * (length - len(text)) + text
+def load_incidents():
+    """
+    Incidentes tipados, parseados una vez por versión del archivo.
+    """
+    with stage("dataset_load"):
+        return cached_aggregate(
+            "metro_incidents",
+            (download_url, file_signature(download_url)),
+            read_incidents,
+        )
 
 
-def process_evacuation_status(evacuation_str):
-    if evacuation_str == "0" or evacuation_str == "#":
-        return "No Evacuation"
-    else:
-        return "Evacuation"
+def pad_text(text, length):
+    return " " * (length - len(text)) + text
 
 
 def graphProgress(template):
-    df = pd.read_csv(download_url)
-
-    df = clean_column_names(df)
+    df = load_incidents()
 
     df_filtered = df.dropna(subset=["cause_primaire"])
 
@@ -60,6 +91,7 @@ def graphProgress(template):
     for i, (cause, percentage) in enumerate(top_5_causes.items()):
         kpis.append({"name": cause, "value": percentage, "color": colors[i]})
 
+    lap("transform")
     fig = go.Figure()
 
     max_arc = 270
@@ -143,41 +175,22 @@ def graphProgress(template):
 
 
 def graphSankey(template):
-    df = pd.read_csv(download_url)
-
-    df = clean_column_names(df)
+    df = load_incidents()
 
     df_sankey = df.dropna(
         subset=["cause_primaire", "cause_secondaire", "evacuation", "annee_civile"]
-    ).copy()
-
-    df_sankey.loc[:, "evacuation_status"] = df_sankey["evacuation"].apply(
-        process_evacuation_status
     )
-
-    links1 = (
-        df_sankey.groupby(["cause_primaire", "cause_secondaire"])
-        .size()
-        .reset_index(name="value")
+    # Categorías en orden alfabético, como las agrupaba groupby
+    df_sankey["evacuation_status"] = pd.Categorical.from_codes(
+        (~df_sankey["evacuated"]).astype("int8"),
+        categories=["Evacuation", "No Evacuation"],
     )
-    links1.columns = ["source", "target", "value"]
 
-    links2 = (
-        df_sankey.groupby(["cause_secondaire", "evacuation_status"])
-        .size()
-        .reset_index(name="value")
+    unique_nodes, source_indices, target_indices, values = sankey_links(
+        df_sankey, ["cause_primaire", "cause_secondaire", "evacuation_status"]
     )
-    links2.columns = ["source", "target", "value"]
-
-    links_df = pd.concat([links1, links2], axis=0)
-
-    unique_nodes = pd.unique(links_df[["source", "target"]].values.ravel("K"))
-    node_map = {node: i for i, node in enumerate(unique_nodes)}
-
-    source_indices = links_df["source"].map(node_map)
-    target_indices = links_df["target"].map(node_map)
-    values = links_df["value"]
 
+    lap("transform")
     fig = go.Figure(
         data=[
             go.Sankey(
@@ -211,5 +224,7 @@ plots = [
         "title": "Primary Causes of Metro Incidents",
         "subtitle": "Distribution of the main causes of incidents, showing the percentage of each.",
         "graph": graphProgress,
+        # Los colores se eligen según la plantilla: el cambio de tema recalcula
+        "theme_patch": False,
     },
 ]
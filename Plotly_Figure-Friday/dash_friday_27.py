@@ -1,61 +1,59 @@
 import geopandas as gpd
-from shapely.geometry import Polygon, LineString, MultiPolygon, MultiLineString, Point
 from shapely import union_all
-from dash import Dash, html, dcc, Input, Output, State
+from dash import Dash, html, dcc, Input, Output, State, Patch, ctx, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import pandas as pd
 import numpy as np
-from scipy.interpolate import griddata
 import plotly.graph_objects as go
+from geo_layers import layer_coordinates, zoom_level
+from salinity_grid import (
+    grid_axes,
+    grid_slice,
+    load_grid,
+    load_samples,
+    slice_histograms,
+    slice_volume_by_range,
+    typed_array,
+    valid_bounds,
+    volume_by_range,
+    volume_lod,
+)
 
 
-df = pd.read_csv("fig-friday-data-july-4-2025/model-grid-subsample.csv")
-df = df[df.dem_m > df.zkm * 1e3]
-
-df["x"] = df["xkm"] * 1e3
-df["y"] = df["ykm"] * 1e3
-df["z"] = df["zkm"] * 1e3
-df["salinity"] = df["mean_tds"]
+df = load_samples()
 
 spacing = 100
-x_range = np.arange(df.x.min(), df.x.max(), spacing)
-y_range = np.arange(df.y.min(), df.y.max(), spacing)
-z_range = np.arange(df.z.min(), df.z.max(), spacing)
-X, Y, Z = np.meshgrid(x_range, y_range, z_range, indexing="ij")
-points = df[["x", "y", "z"]].values
+x_range, y_range, z_range = grid_axes(df, spacing)
 values = df["salinity"].values
-grid_salinity = griddata(points, values, (X, Y, Z), method="linear")
-
-
-def get_coordinates(geom):
-    if isinstance(geom, Point):
-        return [geom.x], [geom.y]
-    elif isinstance(geom, (LineString, MultiLineString)):
-        x, y = [], []
-        geoms = geom.geoms if isinstance(geom, MultiLineString) else [geom]
-        for g in geoms:
-            xi, yi = g.xy
-            x.extend(xi)
-            y.extend(yi)
-        return x, y
-    elif isinstance(geom, (Polygon, MultiPolygon)):
-        x, y = [], []
-        geoms = geom.geoms if isinstance(geom, MultiPolygon) else [geom]
-        for g in geoms:
-            xi, yi = g.exterior.coords.xy
-            x.extend(xi)
-            y.extend(yi)
-        return x, y
-    else:
-        raise ValueError(f"Geometría no soportada: {type(geom)}")
+# Malla interpolada precalculada (python salinity_grid.py), mapeada en memoria
+grid_salinity = load_grid(spacing=spacing)
+# Solo se envía la caja que contiene vóxeles con valor
+grid_bounds = valid_bounds(grid_salinity)
 
+# Vóxeles máximos por nivel de detalle del volumen 3D
+VOLUME_LOD = {"preview": 40_000, "detail": 400_000}
 
-def mainMap():
-    gdf1 = gpd.read_file("CA_Boundary/CA_Boundary.shp").to_crs(epsg=4326)
-    gdf2 = gpd.read_file(
-        "Major_rivers_of_California/Major_rivers_of_California.shp"
-    ).to_crs(epsg=4326)
 
+# Capas del mapa: cada una se dibuja como un único trazo
+MAP_LAYERS = [
+    {
+        "path": "CA_Boundary/CA_Boundary.shp",
+        "trace": dict(
+            fill="toself",
+            fillcolor="rgba(0,128,0,0.3)",
+            line=dict(color="green", width=1),
+            name="Área",
+        ),
+    },
+    {
+        "path": "Major_rivers_of_California/Major_rivers_of_California.shp",
+        "trace": dict(line=dict(color="blue", width=2), name="Río"),
+    },
+]
+MAP_ZOOM = 5
+
+
+def mainMap():
     gdf_pts = gpd.GeoDataFrame(
         df,
         geometry=gpd.points_from_xy(df.Longitude, df.Latitude),
@@ -66,30 +64,11 @@ def mainMap():
     centroid_lon = float(centroid.x)
     centroid_lat = float(centroid.y)
     fig = go.Figure()
-    for idx, row in gdf1.iterrows():
-        x, y = get_coordinates(row.geometry)
+    for layer in MAP_LAYERS:
+        lon, lat = layer_coordinates(layer["path"], MAP_ZOOM)
         fig.add_trace(
             go.Scattermapbox(
-                lon=x,
-                lat=y,
-                mode="lines",
-                fill="toself",
-                fillcolor="rgba(0,128,0,0.3)",
-                line=dict(color="green", width=1),
-                name=f"Área {idx+1}",
-                showlegend=False,
-            )
-        )
-    for idx, row in gdf2.iterrows():
-        x, y = get_coordinates(row.geometry)
-        fig.add_trace(
-            go.Scattermapbox(
-                lon=x,
-                lat=y,
-                mode="lines",
-                line=dict(color="blue", width=2),
-                name=f"Río {idx+1}",
-                showlegend=False,
+                lon=lon, lat=lat, mode="lines", showlegend=False, **layer["trace"]
             )
         )
     fig.add_trace(
@@ -109,8 +88,10 @@ def mainMap():
 
     fig.update_layout(
         mapbox_style="open-street-map",
-        mapbox_zoom=5,
+        mapbox_zoom=MAP_ZOOM,
         mapbox_center={"lat": centroid_lat, "lon": centroid_lon},
+        # Conserva el zoom y la posición del usuario al refinar las capas
+        uirevision="mapa",
         margin=dict(r=0, t=0, l=0, b=0),
         height=700,
         showlegend=False,
@@ -127,17 +108,12 @@ def mainMap():
 voxel_volume = spacing**3
 ranges = [0, 1500, 5000, 9000, np.nanmax(values)]
 volume_summary = {}
-flat_salinity = grid_salinity.flatten()
-valid_mask = ~np.isnan(flat_salinity)
-valid_values = flat_salinity[valid_mask]
+range_volumes = volume_by_range(grid_salinity, ranges, voxel_volume)
 
 for i in range(len(ranges) - 1):
     lower = ranges[i]
     upper = ranges[i + 1]
-    mask = (valid_values >= lower) & (valid_values < upper)
-    n_voxels = np.sum(mask)
-    volume_m3 = n_voxels * voxel_volume
-    volume_summary[f"{int(lower)}–{int(upper)} mg/L"] = volume_m3
+    volume_summary[f"{int(lower)}–{int(upper)} mg/L"] = range_volumes[i]
 
 total_volume = sum(volume_summary.values())
 volume_description_component = html.Div(
@@ -165,13 +141,12 @@ volume_description_component = html.Div(
 )
 
 
-def volumen3D():
+def volumen3D(level="preview"):
+    x, y, z, value = volume_lod(
+        grid_salinity, (x_range, y_range, z_range), grid_bounds, VOLUME_LOD[level]
+    )
     fig = go.Figure(
         data=go.Volume(
-            x=X.flatten(),
-            y=Y.flatten(),
-            z=Z.flatten(),
-            value=grid_salinity.flatten(),
             isomin=np.nanmin(values),
             isomax=np.nanmax(values),
             opacity=0.1,
@@ -212,7 +187,123 @@ def volumen3D():
         margin=dict(l=10, r=10, b=0, t=10),
     )
 
-    return fig
+    # Coordenadas y valores como arrays binarios en lugar de listas JSON
+    figure = fig.to_dict()
+    figure["data"][0].update(
+        x=typed_array(x), y=typed_array(y), z=typed_array(z), value=typed_array(value)
+    )
+    return figure
+
+
+# Cortes 2-D de la malla: posición del eje en la malla y título
+SLICE_AXES = {"x": (0, "x (m)"), "y": (1, "y (m)"), "z": (2, "Depth value (m)")}
+grid_coords = (x_range, y_range, z_range)
+# Histogramas acumulados de cada corte (se calculan una vez y quedan en disco);
+# los límites de ranges están entre sus bordes, así que el reparto es exacto
+slice_edges = np.unique(np.r_[np.linspace(0, ranges[-1], 65), ranges])
+slice_hist = slice_histograms(grid_salinity, slice_edges)
+
+
+def slice_marks(axis):
+    coords = grid_coords[SLICE_AXES[axis][0]]
+    positions = np.linspace(0, len(coords) - 1, 5).round().astype(int)
+    return {int(i): f"{coords[i]:.0f}" for i in positions}
+
+
+def sliceMap(axis, index):
+    n = SLICE_AXES[axis][0]
+    a, b = [i for i in range(3) if i != n]
+    # Solo la parte del corte dentro de la caja con datos
+    plane = grid_slice(grid_salinity, n, index)[grid_bounds[a], grid_bounds[b]]
+    x_title, y_title = SLICE_AXES["xyz"[a]][1], SLICE_AXES["xyz"[b]][1]
+    fig = go.Figure(
+        data=go.Contour(
+            zmin=np.nanmin(values),
+            zmax=np.nanmax(values),
+            colorscale="RdYlBu_r",
+            contours=dict(coloring="heatmap", showlines=True),
+            line=dict(width=0.5),
+            colorbar=dict(
+                title="Salinity (mg/L)", thickness=10, len=0.8, tickformat=".0f"
+            ),
+            hovertemplate=f"{x_title}: %{{x:.0f}}<br>{y_title}: %{{y:.0f}}"
+            "<br>Salinity: %{z:.0f} mg/L<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        height=400,
+        template="none",
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        margin=dict(l=60, r=10, b=40, t=10),
+    )
+
+    figure = fig.to_dict()
+    figure["data"][0].update(
+        x=typed_array(grid_coords[a][grid_bounds[a]]),
+        y=typed_array(grid_coords[b][grid_bounds[b]]),
+        z=typed_array(plane.T),
+    )
+    return figure
+
+
+def slice_summary(axis, index):
+    n, title = SLICE_AXES[axis]
+    volumes = slice_volume_by_range(
+        slice_hist[n], slice_edges, index, ranges, voxel_volume
+    )
+    total = volumes.sum()
+    return html.Div(
+        [
+            html.P(f"Slice at {title} = {grid_coords[n][index]:.0f}:"),
+            *[
+                html.Div(
+                    [
+                        html.Sup(
+                            f" ▸ Range {k}: {v/1e6:.2f} Mm³ "
+                            f"({(v/total if total else 0)*100:.1f}%)"
+                        ),
+                        html.Br(),
+                    ]
+                )
+                for k, v in zip(volume_summary, volumes)
+            ],
+            html.Br(),
+            html.B(f"Interpolated volume in this slice: {total/1e6:.2f} Mm³"),
+        ]
+    )
+
+
+initial_slice = len(z_range) // 2
+slice_explorer_component = dbc.Row(
+    [
+        dbc.Col(
+            [
+                dbc.RadioItems(
+                    id="slice-axis",
+                    options=[
+                        {"label": title, "value": key}
+                        for key, (_, title) in SLICE_AXES.items()
+                    ],
+                    value="z",
+                    inline=True,
+                ),
+                dcc.Slider(
+                    id="slice-index",
+                    min=0,
+                    max=len(z_range) - 1,
+                    step=1,
+                    value=initial_slice,
+                    marks=slice_marks("z"),
+                ),
+                dcc.Graph(id="slice-graph", figure=sliceMap("z", initial_slice)),
+            ],
+            width=8,
+        ),
+        dbc.Col(slice_summary("z", initial_slice), id="slice-summary", width=4),
+    ],
+    className="g-4 mt-2",
+)
 
 
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -220,6 +311,7 @@ app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 app.layout = html.Div(
     [
         dcc.Graph(id="mapa", figure=mainMap()),
+        dcc.Store(id="map-zoom-level", data=zoom_level(MAP_ZOOM)),
         dbc.Modal(
             id="modal",
             is_open=False,
@@ -231,23 +323,46 @@ app.layout = html.Div(
                 dbc.ModalHeader("San Ardo, California, EE. UU."),
                 dbc.ModalBody(
                     dbc.Container(
-                        dbc.Row(
-                            [
-                                dbc.Col(
-                                    dcc.Graph(
-                                        id="grafico-adicional",
-                                        figure=volumen3D(),
+                        [
+                            dbc.Row(
+                                [
+                                    dbc.Col(
+                                        [
+                                            dbc.RadioItems(
+                                                id="volume-detail",
+                                                options=[
+                                                    {
+                                                        "label": "Preview",
+                                                        "value": "preview",
+                                                    },
+                                                    {
+                                                        "label": "Detail",
+                                                        "value": "detail",
+                                                    },
+                                                ],
+                                                value="preview",
+                                                inline=True,
+                                            ),
+                                            dcc.Graph(
+                                                id="grafico-adicional",
+                                                figure=volumen3D(),
+                                            ),
+                                        ],
+                                        width=8,
                                     ),
-                                    width=8,
-                                ),
-                                dbc.Col(
-                                    volume_description_component,
-                                    width=4,
-                                    style={"maxHeight": "700px", "overflowY": "auto"},
-                                ),
-                            ],
-                            className="g-4",
-                        ),
+                                    dbc.Col(
+                                        volume_description_component,
+                                        width=4,
+                                        style={
+                                            "maxHeight": "700px",
+                                            "overflowY": "auto",
+                                        },
+                                    ),
+                                ],
+                                className="g-4",
+                            ),
+                            slice_explorer_component,
+                        ],
                         fluid=True,
                     )
                 ),
@@ -276,5 +391,57 @@ def toggle_modal(clickData, n_close, is_open):
     return is_open
 
 
+@app.callback(
+    Output("mapa", "figure"),
+    Output("map-zoom-level", "data"),
+    Input("mapa", "relayoutData"),
+    State("map-zoom-level", "data"),
+    prevent_initial_call=True,
+)
+def update_map_detail(relayoutData, level):
+    # Al cambiar de nivel de zoom, solo se reenvían las coordenadas de las capas
+    zoom = (relayoutData or {}).get("mapbox.zoom")
+    if zoom is None or zoom_level(zoom) == level:
+        raise PreventUpdate
+    patched = Patch()
+    for i, layer in enumerate(MAP_LAYERS):
+        lon, lat = layer_coordinates(layer["path"], zoom)
+        patched["data"][i]["lon"] = lon
+        patched["data"][i]["lat"] = lat
+    return patched, zoom_level(zoom)
+
+
+@app.callback(
+    Output("grafico-adicional", "figure"),
+    Input("volume-detail", "value"),
+    prevent_initial_call=True,
+)
+def update_volume_detail(level):
+    return volumen3D(level)
+
+
+@app.callback(
+    Output("slice-index", "max"),
+    Output("slice-index", "value"),
+    Output("slice-index", "marks"),
+    Output("slice-graph", "figure"),
+    Output("slice-summary", "children"),
+    Input("slice-axis", "value"),
+    Input("slice-index", "value"),
+    prevent_initial_call=True,
+)
+def update_slice(axis, index):
+    # Al cambiar de eje se reinicia el slider y se dibuja su corte central en
+    # la misma petición; cada paso solo lee y envía un corte 2-D de la malla
+    n_slices = len(grid_coords[SLICE_AXES[axis][0]])
+    if ctx.triggered_id == "slice-axis":
+        index = n_slices // 2
+        slider = (n_slices - 1, index, slice_marks(axis))
+    else:
+        index = min(index, n_slices - 1)
+        slider = (no_update, no_update, no_update)
+    return *slider, sliceMap(axis, index), slice_summary(axis, index)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
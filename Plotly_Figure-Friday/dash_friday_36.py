@@ -1,7 +1,8 @@
 import dash
 from dash import dcc
-from dash import html, Input, Output, ctx, callback
+from dash import html, Input, Output, State, Patch, ctx, callback, no_update
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import plotly.express as px
 import pandas as pd
@@ -17,11 +18,28 @@ config = {'displaylogo': False,'queueLength':0,'responsive': True,
 url = 'test-dataset/map_density_f36.csv'
 df = pd.read_csv(url)
 
+# Serie (años, índice) de cada ubicación, indexada una sola vez
+series = {location: (group['year'].to_numpy(), group['index'].to_numpy())
+          for location, group in df.groupby('location', sort=False)}
+locations = list(series)
+# Color fijo por ubicación: no cambia al añadir o quitar otras
+line_colors = {location: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
+               for i, location in enumerate(locations)}
+
+# Datos del mapa de cada año (lat, lon, z y ubicación), preparados una sola vez:
+# el cliente los pide año a año en lugar de recibir toda la animación al cargar
+years = sorted(int(year) for year in df['year'].unique())
+year_frames = {str(year): {'lat': group['latitude'].tolist(), 'lon': group['longitude'].tolist(),
+                           'z': group['index'].tolist(), 'hovertext': group['location'].tolist()}
+               for year, group in df.groupby('year')}
+# Años que se adelantan al cliente durante la reproducción
+PREFETCH_YEARS = 5
+
 # Create the Dash app
 app = dash.Dash(__name__,external_stylesheets=external_stylesheets)
 
-def mapMain():
-    fig = px.density_map(df, lat="latitude", lon="longitude", z='index', radius=20,animation_frame="year",
+def mapMain(year):
+    fig = px.density_map(df[df['year'] == year], lat="latitude", lon="longitude", z='index', radius=20,
                         zoom=1.2,color_continuous_scale=[
                             [0, '#ACD160'], 
                             [0.02, '#ACD160'], 
@@ -33,7 +51,10 @@ def mapMain():
                             range_color=(0, 230),
                         map_style="carto-positron", height=600, hover_name="location", hover_data={'latitude':False,'longitude':False})
 
-    fig.update_layout(autosize=True,margin={"r":0,"t":0,"l":0,"b":0})
+    # meta: año dibujado; uirevision conserva el zoom del usuario al cambiar de año
+    fig.update_layout(autosize=True,margin={"r":0,"t":0,"l":0,"b":0},meta=year,uirevision='mapa')
+    # El año de la traza (meta) en el hover, como en la animación original
+    fig.update_traces(meta=year, hovertemplate='<b>%{hovertext}</b><br><br>year=%{meta}<br>index=%{z}<extra></extra>')
     fig.layout.coloraxis.colorbar.title = 'PM 2.5'
     fig.layout.coloraxis.colorbar.lenmode='fraction'
     fig.layout.coloraxis.colorbar.len=0.9
@@ -72,8 +93,16 @@ def setColor(fig):
         
 
     return fig
+def locationTrace(location):
+    years, values = series[location]
+    return go.Scatter(x=years, y=values, name=location, legendgroup=location, mode='lines',
+                      line=dict(color=line_colors[location], dash='solid'), showlegend=True,
+                      hovertemplate='location='+location+'<br>year=%{x}<br>index=%{y}<extra></extra>')
+
 def lineChart(countries):
-    fig = px.line(df[df['location'].isin(countries)], x="year", y="index", color='location', height=550)
+    fig = go.Figure([locationTrace(location) for location in countries])
+    fig.update_layout(height=550, xaxis_title='year', yaxis_title='index',
+                      legend=dict(title='location', tracegroupgap=0))
     fig.update_layout(yaxis_range=[0,230],xaxis_range=[1850,2021],margin={"r":0,"t":20,"l":200,"b":0})
     fig = setColor(fig)
     fig.update_yaxes(visible=False, showticklabels=False, showgrid=False, title='')
@@ -100,18 +129,32 @@ menu = html.Div(
 )
 
 distribution = html.Div([dcc.Loading(id="ls-loading-2",color='#018E99', type="cube", style={'padding-top':'100px'},
+    delay_show=500,
     children=[        
-        html.Div([dcc.Graph(figure=mapMain(),config=config,clear_on_unhover=True)]),        
-    ])])
+        html.Div([dcc.Graph(id='map-main',figure=mapMain(years[0]),config=config,clear_on_unhover=True)]),        
+    ]),
+    html.Div([
+        html.Button(html.I(id='map-play-icon', className='bi bi-play-fill'), id='map-play', n_clicks=0,
+                    className='btn btn-sm btn-outline-primary me-2'),
+        html.Div(dcc.Slider(years[0], years[-1], step=1, value=years[0], id='map-year',
+                            marks={year: str(year) for year in years if year % 20 == 0},
+                            tooltip={'placement': 'top', 'always_visible': True}), className='flex-grow-1'),
+    ], className='d-flex align-items-center pt-4'),
+    dcc.Interval(id='map-timer', interval=500, disabled=True),
+    # Años ya enviados al cliente: {año: {lat, lon, z, hovertext}}
+    dcc.Store(id='map-frames', data={}),
+])
 
 graph = html.Div([
     dcc.Dropdown(
-        list(set(df['location'])),
-        [list(set(df['location']))[0]],
+        locations,
+        [locations[0]],
         multi=True,
         id='id-drop',
     ),
-    html.Div([dcc.Graph(id='graph-main',figure=lineChart([list(set(df['location']))[0]]), config=config)])
+    # Ubicaciones dibujadas, en el orden de las trazas de graph-main
+    dcc.Store(id='drawn-locations', data=[locations[0]]),
+    html.Div([dcc.Graph(id='graph-main',figure=lineChart([locations[0]]), config=config)])
     ]
 )
 
@@ -142,14 +185,97 @@ def displayClick(btn1, btn2):
         return graph
 
 @app.callback(
-    Output("graph-main", "figure"),     
+    Output("graph-main", "figure"),
+    Output("drawn-locations", "data"),
     Input('id-drop', 'value'),
+    State('drawn-locations', 'data'),
     prevent_initial_call=True
 )
-def displayClick(value):    
-    return lineChart(value)
+def displayClick(value, drawn):
+    # Solo se añaden o quitan las trazas que cambian; las bandas PM2.5 y
+    # sus anotaciones se quedan en el cliente
+    selected = value or []
+    patched = Patch()
+    for i in reversed(range(len(drawn))):
+        if drawn[i] not in selected:
+            del patched['data'][i]
+    kept = [location for location in drawn if location in selected]
+    for location in selected:
+        if location not in kept:
+            patched['data'].append(locationTrace(location))
+            kept.append(location)
+    return patched, kept
 
+@app.callback(
+    Output("map-frames", "data"),
+    Input('map-year', 'value'),
+    State('map-frames', 'data'),
+)
+def prefetchYears(year, frames):
+    # Se envían el año pedido y los PREFETCH_YEARS siguientes que el cliente
+    # aún no tiene; los que quedan fuera de esa ventana se descartan
+    start = years.index(year)
+    window = [str(y) for y in years[start:start + PREFETCH_YEARS + 1]]
+    frames = frames or {}
+    patched = Patch()
+    changed = False
+    for key in frames:
+        if key not in window:
+            del patched[key]
+            changed = True
+    for key in window:
+        if key not in frames:
+            patched[key] = year_frames[key]
+            changed = True
+    return patched if changed else no_update
 
+# Dibuja el año elegido en cuanto sus datos están en el cliente
+app.clientside_callback(
+    """
+    function(year, frames, figure) {
+        const frame = frames && frames[year];
+        if (!frame || figure.layout.meta === year) {
+            return window.dash_clientside.no_update;
+        }
+        const trace = Object.assign({}, figure.data[0], frame, {meta: year});
+        const layout = Object.assign({}, figure.layout, {meta: year});
+        return Object.assign({}, figure, {data: [trace], layout: layout});
+    }
+    """,
+    Output("map-main", "figure"),
+    Input('map-year', 'value'),
+    Input('map-frames', 'data'),
+    State('map-main', 'figure'),
+)
+
+# Play/pausa y avance del año con el temporizador; al final se detiene
+app.clientside_callback(
+    """
+    function(clicks, ticks, year, first, last, stopped) {
+        const no_update = window.dash_clientside.no_update;
+        if (window.dash_clientside.callback_context.triggered_id === 'map-play') {
+            if (!stopped) {
+                return [no_update, true, 'bi bi-play-fill'];
+            }
+            return [year >= last ? first : no_update, false, 'bi bi-pause-fill'];
+        }
+        if (year >= last) {
+            return [no_update, true, 'bi bi-play-fill'];
+        }
+        return [year + 1, no_update, no_update];
+    }
+    """,
+    Output("map-year", "value"),
+    Output("map-timer", "disabled"),
+    Output("map-play-icon", "className"),
+    Input('map-play', 'n_clicks'),
+    Input('map-timer', 'n_intervals'),
+    State('map-year', 'value'),
+    State('map-year', 'min'),
+    State('map-year', 'max'),
+    State('map-timer', 'disabled'),
+    prevent_initial_call=True
+)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,177 @@
+# geo_layers.py
+"""
+Capas vectoriales (polígonos y líneas) de dash_friday_27 dibujadas como un
+único trazo por capa: las geometrías se simplifican con una tolerancia
+acorde al zoom del mapa y se unen en arrays lon/lat separados por huecos
+(NaN, que plotly interpreta como None). Los arrays se guardan en caché por
+archivo, fecha de modificación y nivel de zoom.
+
+Los shapefiles se convierten una vez a GeoParquet ya en EPSG:4326; las
+lecturas siguientes van por Arrow. Para comparar ambas lecturas:
+
+    python geo_layers.py [shapefile ...] [--repeat 5]
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import statistics
+import sys
+import time
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+import pyarrow.parquet as pq
+import shapely
+from pyproj import CRS
+
+GEO_CACHE_DIR = os.environ.get("GEO_CACHE_DIR", "cache/geo")
+# Las copias se guardan siempre en este CRS: se construye una sola vez en
+# lugar de parsear el PROJJSON de los metadatos en cada lectura
+WGS84 = CRS.from_epsg(4326)
+# Tolerancia de simplificación, en píxeles de pantalla
+SIMPLIFY_PIXELS = float(os.environ.get("GEO_SIMPLIFY_PIXELS", 1.0))
+
+
+def tolerance_for_zoom(zoom, pixels=SIMPLIFY_PIXELS):
+    """
+    Grados que ocupa un píxel (en el ecuador) de un mapa web con ese zoom.
+    """
+    return pixels * 360.0 / (256 * 2**zoom)
+
+
+def source_mtime(path):
+    """
+    Última modificación de un shapefile y sus archivos hermanos (.dbf, .prj...).
+    """
+    stem = os.path.splitext(path)[0]
+    return max(os.stat(p).st_mtime_ns for p in glob.glob(f"{glob.escape(stem)}.*"))
+
+
+def read_shapefile(path):
+    return gpd.read_file(path).to_crs(WGS84)
+
+
+def read_geoparquet(path):
+    """
+    GeoParquet escrito por read_layer, leído con Arrow (geometría en WKB).
+    """
+    table = pq.read_table(path)
+    geometry = shapely.from_wkb(table.column("geometry").to_numpy())
+    attributes = table.drop_columns(["geometry"]).to_pandas()
+    return gpd.GeoDataFrame(attributes, geometry=geometry, crs=WGS84)
+
+
+def _cache_prefix(path):
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(GEO_CACHE_DIR, f"{stem}_{digest}")
+
+
+def read_layer(path, mtime=None):
+    """
+    Capa en EPSG:4326 desde su copia GeoParquet. Si no existe o el
+    shapefile cambió desde que se creó, se lee, se reproyecta y se guarda.
+    """
+    mtime = source_mtime(path) if mtime is None else mtime
+    prefix = _cache_prefix(path)
+    cached = f"{prefix}_{mtime}.parquet"
+    if os.path.exists(cached):
+        return read_geoparquet(cached)
+    gdf = read_shapefile(path)
+    os.makedirs(GEO_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cached}.{os.getpid()}.tmp"
+    gdf.to_parquet(tmp_path)
+    os.replace(tmp_path, cached)
+    # Las copias de versiones anteriores del shapefile ya no sirven
+    for stale in glob.glob(f"{glob.escape(prefix)}_*.parquet"):
+        if stale != cached:
+            os.remove(stale)
+    return gdf
+
+
+@lru_cache(maxsize=8)
+def _layer_geometries(path, mtime):
+    return read_layer(path, mtime).geometry.to_numpy()
+
+
+def merged_coordinates(geometries):
+    """
+    lon, lat de todas las geometrías en un solo par de arrays, con un NaN
+    entre partes. De los polígonos se dibuja el anillo exterior.
+    """
+    parts = shapely.get_parts(geometries)
+    polygons = shapely.get_type_id(parts) == shapely.GeometryType.POLYGON
+    parts[polygons] = shapely.get_exterior_ring(parts[polygons])
+    coords, index = shapely.get_coordinates(parts, return_index=True)
+    # Cada parte se desplaza tantas posiciones como partes la preceden:
+    # los huecos que quedan son los separadores
+    merged = np.full((len(coords) + len(parts), 2), np.nan)
+    merged[np.arange(len(coords)) + index] = coords
+    merged = merged[:-1]
+    merged.setflags(write=False)
+    return merged[:, 0], merged[:, 1]
+
+
+@lru_cache(maxsize=64)
+def _layer_coordinates(path, mtime, level):
+    geometries = shapely.simplify(
+        _layer_geometries(path, mtime),
+        tolerance_for_zoom(level),
+        preserve_topology=True,
+    )
+    return merged_coordinates(geometries)
+
+
+def zoom_level(zoom):
+    """
+    Nivel entero de zoom: los niveles comparten la caché de coordenadas.
+    """
+    return max(0, int(zoom))
+
+
+def layer_coordinates(path, zoom):
+    """
+    lon, lat (solo lectura) de la capa simplificada para ese zoom.
+    """
+    return _layer_coordinates(path, source_mtime(path), zoom_level(zoom))
+
+
+def _median_seconds(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lectura del shapefile (con reproyección) frente a la copia GeoParquet"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[
+            "CA_Boundary/CA_Boundary.shp",
+            "Major_rivers_of_California/Major_rivers_of_California.shp",
+        ],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'capa':<40}{'shapefile s':>13}{'geoparquet s':>14}{'mejora':>9}")
+    for path in args.paths:
+        read_layer(path)
+        cold = _median_seconds(lambda: read_shapefile(path), args.repeat)
+        cached = _median_seconds(lambda: read_layer(path), args.repeat)
+        name = os.path.basename(path)
+        print(f"{name:<40}{cold:13.3f}{cached:14.3f}{cold / cached:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# salinity_grid.py
+"""
+Malla 3-D de salinidad de dash_friday_27 precalculada fuera de la app.
+La interpolación lineal (la misma que griddata) se reparte por bloques del
+eje x entre procesos y se escribe en un .npy que la app mapea en memoria.
+El archivo se identifica por el hash del csv de origen y el espaciado.
+
+    python salinity_grid.py [--spacing 100] [--workers 4]
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import LinearNDInterpolator
+
+DATA_PATH = "fig-friday-data-july-4-2025/model-grid-subsample.csv"
+GRID_DIR = os.environ.get("SALINITY_GRID_DIR", "cache")
+SPACING = 100
+# Puntos de la malla por bloque de trabajo
+CHUNK_POINTS = int(os.environ.get("SALINITY_CHUNK_POINTS", 2_000_000))
+
+_interpolator = None
+
+
+def _load_encoding():
+    """
+    utils/encoding.py de Dash-FF, cargado por ruta (Dash-FF no es un
+    paquete importable): un solo codificador del formato binario de plotly.js.
+    """
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "Dash-FF", "utils", "encoding.py"
+    )
+    spec = importlib.util.spec_from_file_location("dash_ff_encoding", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_encoding = _load_encoding()
+
+
+def load_samples(path=DATA_PATH):
+    """
+    Muestras del modelo por encima del terreno, con coordenadas en metros.
+    """
+    df = pd.read_csv(path)
+    df = df[df.dem_m > df.zkm * 1e3]
+
+    df["x"] = df["xkm"] * 1e3
+    df["y"] = df["ykm"] * 1e3
+    df["z"] = df["zkm"] * 1e3
+    df["salinity"] = df["mean_tds"]
+    return df
+
+
+def grid_axes(df, spacing):
+    """
+    Coordenadas de la malla en cada eje (x, y, z).
+    """
+    return tuple(np.arange(df[c].min(), df[c].max(), spacing) for c in "xyz")
+
+
+def source_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def grid_path(path=DATA_PATH, spacing=SPACING):
+    return os.path.join(GRID_DIR, f"salinity_{source_hash(path)[:16]}_{spacing:g}.npy")
+
+
+def _slabs(shape):
+    """
+    Bloques (start, stop) del eje x de unos CHUNK_POINTS puntos cada uno.
+    """
+    slab = max(1, CHUNK_POINTS // max(1, shape[1] * shape[2]))
+    return [(s, min(s + slab, shape[0])) for s in range(0, shape[0], slab)]
+
+
+def _init_worker(interpolator):
+    global _interpolator
+    _interpolator = interpolator
+
+
+def _fill_slab(out_path, axes, start, stop):
+    """
+    Interpola las capas start:stop del eje x y las escribe en el .npy.
+    """
+    x, y, z = axes
+    X, Y, Z = np.meshgrid(x[start:stop], y, z, indexing="ij")
+    grid = np.lib.format.open_memmap(out_path, mode="r+")
+    grid[start:stop] = _interpolator((X, Y, Z))
+    grid.flush()
+    return stop - start
+
+
+def build_grid(path=DATA_PATH, spacing=SPACING, workers=None):
+    """
+    Calcula la malla y la guarda en grid_path(path, spacing).
+    """
+    df = load_samples(path)
+    axes = grid_axes(df, spacing)
+    shape = tuple(len(a) for a in axes)
+    out_path = grid_path(path, spacing)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=shape)
+
+    # La triangulación de Delaunay se construye una sola vez y se envía a
+    # cada proceso junto con el interpolador
+    interpolator = LinearNDInterpolator(
+        df[["x", "y", "z"]].values, df["salinity"].values, fill_value=np.nan
+    )
+    bounds = _slabs(shape)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(bounds) == 1:
+        _init_worker(interpolator)
+        for start, stop in bounds:
+            _fill_slab(tmp_path, axes, start, stop)
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(interpolator,)
+        ) as pool:
+            futures = [
+                pool.submit(_fill_slab, tmp_path, axes, start, stop)
+                for start, stop in bounds
+            ]
+            for future in futures:
+                future.result()
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def load_grid(path=DATA_PATH, spacing=SPACING):
+    """
+    Malla mapeada en memoria (solo lectura); se calcula si aún no existe.
+    """
+    out_path = grid_path(path, spacing)
+    if not os.path.exists(out_path):
+        print(f"Calculando la malla de salinidad ({out_path})...")
+        build_grid(path, spacing)
+    return np.load(out_path, mmap_mode="r")
+
+
+def volume_by_range(grid, ranges, voxel_volume):
+    """
+    Volumen de los vóxeles con lower <= salinidad < upper para cada par de
+    límites consecutivos de ranges, recorriendo la malla por bloques.
+    """
+    counts = np.zeros(len(ranges) + 1, dtype=np.int64)
+    for start, stop in _slabs(grid.shape):
+        block = grid[start:stop]
+        valid = block[~np.isnan(block)]
+        bins = np.searchsorted(ranges, valid, side="right")
+        counts += np.bincount(bins, minlength=len(counts))
+    return counts[1 : len(ranges)] * voxel_volume
+
+
+def valid_bounds(grid):
+    """
+    Recorte (slices por eje) que contiene todos los vóxeles con valor.
+    """
+    any_x = np.zeros(grid.shape[0], dtype=bool)
+    any_y = np.zeros(grid.shape[1], dtype=bool)
+    any_z = np.zeros(grid.shape[2], dtype=bool)
+    for start, stop in _slabs(grid.shape):
+        valid = ~np.isnan(grid[start:stop])
+        any_x[start:stop] = valid.any(axis=(1, 2))
+        any_y |= valid.any(axis=(0, 2))
+        any_z |= valid.any(axis=(0, 1))
+    bounds = []
+    for present in (any_x, any_y, any_z):
+        index = np.flatnonzero(present)
+        bounds.append(slice(index[0], index[-1] + 1) if len(index) else slice(0, 0))
+    return tuple(bounds)
+
+
+def lod_step(shape, max_voxels):
+    """
+    Paso de submuestreo (igual en los tres ejes) para no superar max_voxels.
+    """
+    step = 1
+    while np.prod([-(-n // step) for n in shape]) > max_voxels:
+        step += 1
+    return step
+
+
+def volume_lod(grid, axes, bounds, max_voxels):
+    """
+    Coordenadas y valores aplanados (float32) del recorte bounds de la
+    malla, submuestreado para no superar max_voxels.
+    """
+    shape = [len(range(*b.indices(n))) for b, n in zip(bounds, grid.shape)]
+    step = lod_step(shape, max_voxels)
+    sampled = tuple(slice(b.start, b.stop, step) for b in bounds)
+    coords = np.meshgrid(*(axis[s] for axis, s in zip(axes, sampled)), indexing="ij")
+    value = np.asarray(grid[sampled], dtype=np.float32)
+    return tuple(c.astype(np.float32).ravel() for c in coords) + (value.ravel(),)
+
+
+def typed_array(values):
+    """
+    Array en el formato binario de plotly.js, en float32.
+    """
+    return _encoding.typed_array(values, dtype="f4")
+
+
+def grid_slice(grid, axis, index):
+    """
+    Corte 2-D de la malla en la posición index del eje axis.
+    """
+    return np.take(grid, index, axis=axis)
+
+
+def slice_histograms(grid, edges):
+    """
+    Histogramas acumulados de cada corte en los tres ejes: para el eje a,
+    un array (cortes × (len(edges) + 2)) cuya columna m cuenta los vóxeles
+    del corte con salinidad < edges[m]. Se calculan en una pasada por
+    bloques sobre la malla y se guardan junto al .npy.
+    """
+    edges = np.asarray(edges, dtype=float)
+    key = hashlib.sha1(edges.tobytes()).hexdigest()[:8]
+    path = f"{os.path.splitext(grid.filename)[0]}_hist_{key}.npz"
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return [data[f"axis{axis}"] for axis in range(3)]
+
+    # Cubeta b: edges[b-1] <= v < edges[b]; la última cubeta, los NaN
+    n_buckets = len(edges) + 2
+    counts = [np.zeros((n, n_buckets), dtype=np.int64) for n in grid.shape]
+    for start, stop in _slabs(grid.shape):
+        block = np.asarray(grid[start:stop])
+        buckets = np.searchsorted(edges, block, side="right")
+        buckets[np.isnan(block)] = n_buckets - 1
+        for axis in range(3):
+            per_slice = np.moveaxis(buckets, axis, 0).reshape(buckets.shape[axis], -1)
+            index = np.arange(len(per_slice))[:, np.newaxis] * n_buckets + per_slice
+            block_counts = np.bincount(
+                index.ravel(), minlength=len(per_slice) * n_buckets
+            ).reshape(-1, n_buckets)
+            if axis == 0:
+                counts[0][start:stop] += block_counts
+            else:
+                counts[axis] += block_counts
+    cumulative = [np.cumsum(c, axis=1) for c in counts]
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **{f"axis{axis}": c for axis, c in enumerate(cumulative)})
+    os.replace(tmp_path, path)
+    return cumulative
+
+
+def slice_volume_by_range(cumulative, edges, index, ranges, voxel_volume):
+    """
+    Volumen con lower <= salinidad < upper en el corte index, para cada par
+    de límites consecutivos de ranges (todos ellos presentes en edges).
+    """
+    positions = np.searchsorted(edges, ranges)
+    below = cumulative[index][positions]
+    return np.diff(below) * voxel_volume
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--spacing", type=int, default=SPACING)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out_path = build_grid(args.data, args.spacing, args.workers)
+    grid = np.load(out_path, mmap_mode="r")
+    print(
+        f"{out_path}: {grid.shape} ({grid.nbytes / 1e6:.1f} MB) "
+        f"en {time.perf_counter() - start:.1f} s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
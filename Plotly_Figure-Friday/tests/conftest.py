@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# Módulos auxiliares de los dash_friday_*.py (salinity_grid, geo_layers...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,124 @@
+# test_dash_friday_36.py
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+LOCATIONS = ["Kabul, Afghanistan", "Tirana, Albania", "Luanda, Angola"]
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    # La app lee test-dataset/map_density_f36.csv al importarse
+    folder = tmp_path_factory.mktemp("ff36")
+    os.makedirs(folder / "test-dataset")
+    rng = np.random.default_rng(3)
+    rows = [
+        {
+            "location": location,
+            "latitude": 10.0 * i,
+            "longitude": 20.0 * i,
+            "index": rng.uniform(0, 230),
+            "year": year,
+        }
+        for year in range(1850, 1860)
+        for i, location in enumerate(LOCATIONS)
+    ]
+    pd.DataFrame(rows).to_csv(folder / "test-dataset" / "map_density_f36.csv")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(folder)
+        sys.modules.pop("dash_friday_36", None)
+        module = importlib.import_module("dash_friday_36")
+    yield module
+    sys.modules.pop("dash_friday_36", None)
+
+
+def operations(patch):
+    return [
+        (op["operation"], op["location"], op["params"].get("value"))
+        for op in patch.to_plotly_json()["operations"]
+    ]
+
+
+def test_line_chart_traces_match_filtered_frame(app_module):
+    df = app_module.df
+    fig = app_module.lineChart(LOCATIONS[:2])
+    assert [trace.name for trace in fig.data] == LOCATIONS[:2]
+    for trace in fig.data:
+        expected = df[df["location"] == trace.name]
+        np.testing.assert_array_equal(trace.x, expected["year"])
+        np.testing.assert_array_equal(trace.y, expected["index"])
+    # Bandas PM2.5 y sus anotaciones, una vez por figura
+    assert len(fig.layout.shapes) == len(app_module.config_pm25)
+    assert len(fig.layout.annotations) == len(app_module.config_pm25)
+
+
+def test_location_colors_do_not_depend_on_selection(app_module):
+    alone = app_module.lineChart(LOCATIONS[2:])
+    together = app_module.lineChart(LOCATIONS)
+    assert alone.data[0].line.color == together.data[2].line.color
+
+
+def test_dropdown_patch_only_touches_changed_traces(app_module):
+    drawn = LOCATIONS[:2]
+    patched, kept = app_module.displayClick([LOCATIONS[1], LOCATIONS[2]], drawn)
+    assert kept == [LOCATIONS[1], LOCATIONS[2]]
+    ops = operations(patched)
+    assert [(op, location) for op, location, _ in ops] == [
+        ("Delete", ["data", 0]),
+        ("Append", ["data"]),
+    ]
+    assert ops[1][2].name == LOCATIONS[2]
+
+    patched, kept = app_module.displayClick(None, kept)
+    assert kept == []
+    assert [location for _, location, _ in operations(patched)] == [
+        ["data", 1],
+        ["data", 0],
+    ]
+
+
+def test_year_frames_hold_each_year_rows(app_module):
+    df = app_module.df
+    assert app_module.years == list(range(1850, 1860))
+    for year in app_module.years:
+        rows = df[df["year"] == year]
+        frame = app_module.year_frames[str(year)]
+        assert frame["hovertext"] == rows["location"].tolist()
+        assert frame["z"] == rows["index"].tolist()
+        assert frame["lat"] == rows["latitude"].tolist()
+
+
+def test_map_main_draws_only_the_requested_year(app_module):
+    fig = app_module.mapMain(1852)
+    assert fig.layout.meta == 1852
+    # La traza lleva su año para el hover
+    assert fig.data[0].meta == 1852
+    assert "year=%{meta}" in fig.data[0].hovertemplate
+    assert not fig.frames
+    assert list(fig.data[0].z) == app_module.year_frames["1852"]["z"]
+
+
+def test_prefetch_years_sends_window_and_drops_old_years(app_module):
+    window = app_module.PREFETCH_YEARS + 1
+    patched = app_module.prefetchYears(1850, None)
+    sent = [location[0] for _, location, _ in operations(patched)]
+    assert sent == [str(year) for year in range(1850, 1850 + window)]
+
+    frames = {key: app_module.year_frames[key] for key in sent}
+    ops = operations(app_module.prefetchYears(1852, frames))
+    assert [(op, location) for op, location, _ in ops] == [
+        ("Delete", ["1850"]),
+        ("Delete", ["1851"]),
+        ("Assign", ["1856"]),
+        ("Assign", ["1857"]),
+    ]
+    assert ops[2][2] == app_module.year_frames["1856"]
+
+
+def test_prefetch_years_skips_update_when_window_is_loaded(app_module):
+    frames = {str(year): {} for year in range(1854, 1860)}
+    assert app_module.prefetchYears(1854, frames) is app_module.no_update
@@ -0,0 +1,113 @@
+# test_geo_layers.py
+import glob
+import os
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import LineString, MultiPolygon, Polygon
+
+import geo_layers
+from geo_layers import (
+    layer_coordinates,
+    merged_coordinates,
+    read_layer,
+    source_mtime,
+    tolerance_for_zoom,
+    zoom_level,
+)
+
+
+def test_tolerance_for_zoom_halves_per_level():
+    assert tolerance_for_zoom(0, pixels=1) == pytest.approx(360 / 256)
+    assert tolerance_for_zoom(3, pixels=2) == pytest.approx(2 * 360 / (256 * 8))
+    for zoom in range(10):
+        assert tolerance_for_zoom(zoom + 1) == pytest.approx(
+            tolerance_for_zoom(zoom) / 2
+        )
+
+
+@pytest.mark.parametrize("zoom, level", [(-1.5, 0), (0, 0), (5.2, 5), (5.99, 5)])
+def test_zoom_level(zoom, level):
+    assert zoom_level(zoom) == level
+
+
+def test_merged_coordinates_separates_parts_with_nan():
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 0)])
+    hole = Polygon(
+        [(10, 10), (14, 10), (14, 14), (10, 10)],
+        holes=[[(11, 11), (12, 11), (12, 12), (11, 11)]],
+    )
+    line = LineString([(5, 5), (6, 6)])
+    geometries = np.array([MultiPolygon([square, hole]), line], dtype=object)
+    lon, lat = merged_coordinates(geometries)
+
+    parts = [
+        shapely.get_coordinates(square.exterior),
+        shapely.get_coordinates(hole.exterior),
+        shapely.get_coordinates(line),
+    ]
+    expected = np.vstack([np.vstack([part, [[np.nan, np.nan]]]) for part in parts])[:-1]
+    np.testing.assert_array_equal(lon, expected[:, 0])
+    np.testing.assert_array_equal(lat, expected[:, 1])
+    # Los anillos interiores no se dibujan y los arrays son de solo lectura
+    assert np.count_nonzero(np.isnan(lon)) == len(parts) - 1
+    assert not lon.flags.writeable
+
+
+@pytest.fixture
+def shapefile(tmp_path, monkeypatch):
+    monkeypatch.setattr(geo_layers, "GEO_CACHE_DIR", str(tmp_path / "geo"))
+    # Capa en UTM para comprobar la reproyección a EPSG:4326
+    gdf = gpd.GeoDataFrame(
+        {"name": ["a", "b"], "value": [1, 2]},
+        geometry=[
+            LineString([(500000, 0), (505000, 100), (510000, 0), (515000, 100)]),
+            LineString([(520000, 5000), (530000, 6000), (540000, 5000)]),
+        ],
+        crs="EPSG:32631",
+    )
+    path = tmp_path / "layer.shp"
+    gdf.to_file(path)
+    return str(path)
+
+
+def cached_copies():
+    return glob.glob(os.path.join(geo_layers.GEO_CACHE_DIR, "*.parquet"))
+
+
+def test_read_layer_round_trips_through_geoparquet(shapefile):
+    first = read_layer(shapefile)
+    assert first.crs.to_epsg() == 4326
+    assert len(cached_copies()) == 1
+
+    second = read_layer(shapefile)
+    assert second.crs.to_epsg() == 4326
+    assert list(second.columns) == list(first.columns)
+    assert (second["name"] == first["name"]).all()
+    assert shapely.equals_exact(
+        second.geometry.to_numpy(), first.geometry.to_numpy(), tolerance=1e-9
+    ).all()
+
+
+def test_read_layer_replaces_stale_copy(shapefile):
+    read_layer(shapefile)
+    (old,) = cached_copies()
+    mtime = source_mtime(shapefile) + 10**9
+    for path in glob.glob(shapefile[:-4] + ".*"):
+        os.utime(path, ns=(mtime, mtime))
+    read_layer(shapefile)
+    (new,) = cached_copies()
+    assert new != old
+    assert new.endswith(f"_{mtime}.parquet")
+
+
+def test_layer_coordinates_simplify_with_zoom(shapefile):
+    coarse_lon, _ = layer_coordinates(shapefile, 2)
+    fine_lon, fine_lat = layer_coordinates(shapefile, 14.7)
+    assert layer_coordinates(shapefile, 14.2)[0] is fine_lon
+    # A zoom 2 los zigzags de 100 m desaparecen; a zoom 14 se conservan
+    assert len(coarse_lon) == 2 + 1 + 2
+    assert len(fine_lon) == 4 + 1 + 3
+    assert np.isnan(fine_lat[4])
@@ -0,0 +1,191 @@
+# test_salinity_grid.py
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.interpolate import griddata
+
+import salinity_grid
+from salinity_grid import (
+    build_grid,
+    grid_axes,
+    grid_path,
+    grid_slice,
+    load_grid,
+    load_samples,
+    lod_step,
+    slice_histograms,
+    slice_volume_by_range,
+    valid_bounds,
+    volume_by_range,
+    volume_lod,
+)
+
+SPACING = 250
+
+
+@pytest.fixture
+def samples_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(salinity_grid, "GRID_DIR", str(tmp_path / "cache"))
+    # Bloques de pocos puntos: varias franjas del eje x
+    monkeypatch.setattr(salinity_grid, "CHUNK_POINTS", 500)
+    rng = np.random.default_rng(5)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "xkm": rng.uniform(0, 3, n),
+            "ykm": rng.uniform(0, 2, n),
+            "zkm": rng.uniform(-1, 0.5, n),
+            "dem_m": rng.uniform(-200, 400, n),
+        }
+    )
+    df["mean_tds"] = 500 + 800 * df["xkm"] - 300 * df["zkm"] + rng.normal(0, 50, n)
+    path = tmp_path / "samples.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def expected_grid(path, spacing):
+    df = load_samples(path)
+    axes = grid_axes(df, spacing)
+    X, Y, Z = np.meshgrid(*axes, indexing="ij")
+    return griddata(
+        df[["x", "y", "z"]].values, df["salinity"].values, (X, Y, Z), method="linear"
+    )
+
+
+def test_load_samples_keeps_points_above_ground(samples_csv):
+    df = load_samples(samples_csv)
+    assert (df["dem_m"] > df["z"]).all()
+    np.testing.assert_allclose(df["x"], df["xkm"] * 1e3)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_grid_matches_griddata(samples_csv, workers):
+    out_path = build_grid(samples_csv, SPACING, workers)
+    assert out_path == grid_path(samples_csv, SPACING)
+    grid = np.load(out_path)
+    expected = expected_grid(samples_csv, SPACING)
+    assert grid.shape == expected.shape
+    np.testing.assert_allclose(grid, expected, equal_nan=True)
+
+
+def test_load_grid_builds_once_and_maps_read_only(samples_csv, capsys):
+    grid = load_grid(samples_csv, SPACING)
+    assert "Calculando" in capsys.readouterr().out
+    assert isinstance(grid, np.memmap)
+    assert not grid.flags.writeable
+    load_grid(samples_csv, SPACING)
+    assert capsys.readouterr().out == ""
+
+
+def test_grid_path_follows_content_and_spacing(samples_csv):
+    first = grid_path(samples_csv, SPACING)
+    assert grid_path(samples_csv, 100) != first
+    with open(samples_csv, "a") as f:
+        f.write("1,1,0,100,900\n")
+    assert grid_path(samples_csv, SPACING) != first
+
+
+def test_volume_by_range_counts_voxels_per_range(samples_csv):
+    grid = load_grid(samples_csv, SPACING)
+    ranges = [0, 1000, 2000, 5000]
+    volumes = volume_by_range(grid, ranges, voxel_volume=2.0)
+    values = np.asarray(grid)[~np.isnan(grid)]
+    expected = [
+        2.0 * np.count_nonzero((values >= low) & (values < high))
+        for low, high in zip(ranges, ranges[1:])
+    ]
+    np.testing.assert_array_equal(volumes, expected)
+
+
+@pytest.fixture
+def padded_grid():
+    # Malla con bordes vacíos (NaN) alrededor de un bloque con valores
+    grid = np.full((12, 9, 7), np.nan)
+    grid[3:10, 2:6, 1:4] = np.arange(7 * 4 * 3, dtype=float).reshape(7, 4, 3)
+    return grid
+
+
+def test_valid_bounds_crops_empty_borders(padded_grid, monkeypatch):
+    # Franjas de una sola capa: el recorte debe unir todas
+    monkeypatch.setattr(salinity_grid, "CHUNK_POINTS", 9 * 7)
+    assert valid_bounds(padded_grid) == (slice(3, 10), slice(2, 6), slice(1, 4))
+    assert valid_bounds(np.full((2, 2, 2), np.nan)) == (slice(0, 0),) * 3
+
+
+@pytest.mark.parametrize(
+    "shape, max_voxels, step",
+    [((10, 10, 10), 1000, 1), ((10, 10, 10), 999, 2), ((10, 10, 10), 64, 3)],
+)
+def test_lod_step(shape, max_voxels, step):
+    assert lod_step(shape, max_voxels) == step
+
+
+def test_volume_lod_subsamples_cropped_grid(padded_grid):
+    axes = [np.arange(n) * 10.0 for n in padded_grid.shape]
+    bounds = valid_bounds(padded_grid)
+    full = volume_lod(padded_grid, axes, bounds, max_voxels=10**6)
+    assert all(a.dtype == np.float32 for a in full)
+    assert len(full[3]) == 7 * 4 * 3
+    assert not np.isnan(full[3]).any()
+
+    x, y, z, value = volume_lod(padded_grid, axes, bounds, max_voxels=20)
+    assert len(value) <= 20
+    np.testing.assert_array_equal(
+        value, padded_grid[3:10:2, 2:6:2, 1:4:2].ravel().astype(np.float32)
+    )
+    np.testing.assert_array_equal(np.unique(x), [30, 50, 70, 90])
+
+
+EDGES = [0, 1000, 1500, 2000, 5000]
+
+
+@pytest.fixture
+def mapped_grid(tmp_path, monkeypatch):
+    monkeypatch.setattr(salinity_grid, "CHUNK_POINTS", 3 * 8 * 5)
+    rng = np.random.default_rng(11)
+    grid = rng.uniform(-100, 5500, (10, 8, 5))
+    grid[rng.random(grid.shape) < 0.2] = np.nan
+    path = tmp_path / "grid.npy"
+    np.save(path, grid)
+    return np.load(path, mmap_mode="r")
+
+
+def test_grid_slice_takes_plane_along_axis(mapped_grid):
+    np.testing.assert_array_equal(grid_slice(mapped_grid, 0, 4), mapped_grid[4])
+    np.testing.assert_array_equal(grid_slice(mapped_grid, 1, 2), mapped_grid[:, 2])
+    np.testing.assert_array_equal(grid_slice(mapped_grid, 2, 3), mapped_grid[:, :, 3])
+
+
+def test_slice_histograms_match_direct_counts(mapped_grid):
+    cumulative = slice_histograms(mapped_grid, EDGES)
+    for axis in range(3):
+        assert cumulative[axis].shape == (mapped_grid.shape[axis], len(EDGES) + 2)
+        for index in range(mapped_grid.shape[axis]):
+            plane = grid_slice(mapped_grid, axis, index)
+            expected = [np.count_nonzero(plane < edge) for edge in EDGES]
+            np.testing.assert_array_equal(
+                cumulative[axis][index][: len(EDGES)], expected
+            )
+            assert cumulative[axis][index][-1] == plane.size
+
+
+def test_slice_histograms_reuses_saved_file(mapped_grid, monkeypatch):
+    first = slice_histograms(mapped_grid, EDGES)
+    monkeypatch.setattr(salinity_grid, "_slabs", None)
+    second = slice_histograms(mapped_grid, EDGES)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_slice_volume_by_range_matches_direct_volume(mapped_grid):
+    cumulative = slice_histograms(mapped_grid, EDGES)
+    ranges = [0, 1500, 5000]
+    for index in range(mapped_grid.shape[2]):
+        plane = grid_slice(mapped_grid, 2, index)
+        expected = [
+            4.0 * np.count_nonzero((plane >= low) & (plane < high))
+            for low, high in zip(ranges, ranges[1:])
+        ]
+        volumes = slice_volume_by_range(cumulative[2], EDGES, index, ranges, 4.0)
+        np.testing.assert_array_equal(volumes, expected)